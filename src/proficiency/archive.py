@@ -0,0 +1,28 @@
+import tarfile
+from functools import partial
+from pathlib import Path
+
+
+def normalize_tar_info(
+    tar_info: tarfile.TarInfo, mtime: int | None = None
+) -> tarfile.TarInfo:
+    "Remove owner and permission of the build machine from the tar header."
+    tar_info.uid = tar_info.gid = 0
+    tar_info.uname = tar_info.gname = ""
+    tar_info.mode = 0o644
+    if mtime is not None:
+        tar_info.mtime = mtime
+    return tar_info
+
+
+def create_tar_bz2(tar_path: Path, paths: list[Path], mtime: int | None = None) -> None:
+    """
+    Write members to a tar.bz2 file of one bz2 stream, the file could be read by
+    the "r|bz2" stream mode of `tarfile`. bz2 releases the GIL while compressing,
+    archives could be created in threads.
+    """
+    tmp_path = tar_path.with_suffix(".tmp")
+    with tarfile.open(tmp_path, mode="w:bz2") as tar_f:
+        for path in paths:
+            tar_f.add(path, path.name, filter=partial(normalize_tar_info, mtime=mtime))
+    tmp_path.replace(tar_path)
@@ -0,0 +1,158 @@
+import json
+import time
+from collections.abc import Callable, Collection, Iterable
+from pathlib import Path
+from typing import Any
+
+MANIFEST_DIR = Path("build/manifest")
+STAGES = ("split", "wiktionary", "kindle", "klld", "archive", "x-ray")
+
+type FileRecord = dict[str, int | str]
+
+
+def file_sha256(path: Path) -> str:
+    """
+    Hash the file from mmap, hashlib releases the GIL for large data so files
+    could be hashed in threads.
+    """
+    import hashlib
+    import mmap
+
+    with path.open("rb") as f:
+        if path.stat().st_size == 0:
+            return hashlib.sha256().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha256(mm).hexdigest()
+
+
+def file_record(path: Path, cached_record: FileRecord | None = None) -> FileRecord:
+    """
+    Return size, modification time and SHA-256 digest of the file, the digest of
+    `cached_record` is reused if the file's size and modification time are not
+    changed.
+    """
+    stat = path.stat()
+    if (
+        cached_record is not None
+        and cached_record.get("size") == stat.st_size
+        and cached_record.get("mtime_ns") == stat.st_mtime_ns
+    ):
+        return cached_record
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_sha256(path),
+    }
+
+
+class BuildStep:
+    """
+    A build step's record saved in "build/manifest/<stage>/<name>.json". Each step
+    has its own file, so steps running in different processes don't write the
+    same file.
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        name: str,
+        inputs: Iterable[Path] = (),
+        params: dict[str, Any] | None = None,
+    ) -> None:
+        from .config import VERSION
+
+        self.stage = stage
+        self.name = name
+        self.inputs = sorted(set(inputs))
+        self.params = {"version": VERSION} | (params or {})
+        self.path = MANIFEST_DIR / stage / f"{name}.json"
+
+    def load_record(self) -> dict[str, Any] | None:
+        if not self.path.is_file():
+            return None
+        with self.path.open(encoding="utf-8") as f:
+            return json.load(f)
+
+    def reusable_outputs(self) -> list[Path] | None:
+        """
+        Return the outputs of the last build if the step's parameters, input and
+        output files are not changed.
+        """
+        record = self.load_record()
+        if (
+            record is None
+            or record["params"] != self.params
+            or list(record["inputs"]) != [str(path) for path in self.inputs]
+        ):
+            return None
+        # update cached file records of touched files
+        for files in (record["inputs"], record["outputs"]):
+            for path_str, cached_record in files.items():
+                path = Path(path_str)
+                if not path.is_file():
+                    return None
+                new_record = file_record(path, cached_record)
+                if new_record["sha256"] != cached_record["sha256"]:
+                    return None
+                files[path_str] = new_record
+        self.save_record(record, built=False)
+        return [Path(path_str) for path_str in record["outputs"]]
+
+    def save(self, outputs: Iterable[Path]) -> None:
+        record = {
+            "params": self.params,
+            "inputs": {str(path): file_record(path) for path in self.inputs},
+            "outputs": {str(path): file_record(path) for path in outputs},
+        }
+        self.save_record(record, built=True)
+
+    def save_record(self, record: dict[str, Any], built: bool) -> None:
+        now = time.time_ns()
+        if built:
+            record["built_at"] = now
+        record["used_at"] = now
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        tmp_path.replace(self.path)
+
+
+def run_step(
+    step: BuildStep,
+    build: Callable[[], list[Path]],
+    force_stages: Collection[str] = (),
+) -> list[Path]:
+    from .config import logger
+    from .trace import trace_span
+
+    with trace_span(step.stage, step.name) as trace_args:
+        if step.stage not in force_stages:
+            outputs = step.reusable_outputs()
+            if outputs is not None:
+                logger.info(f"Reuse {step.stage} step {step.name}")
+                trace_args["reused"] = True
+                return outputs
+        outputs = build()
+        step.save(outputs)
+        trace_args["reused"] = False
+        return outputs
+
+
+def build_report(since: int) -> dict[str, dict[str, list[str]]]:
+    """
+    Return built and reused steps of each stage that are used after `since`
+    nanoseconds since the epoch.
+    """
+    report: dict[str, dict[str, list[str]]] = {}
+    for stage in STAGES:
+        for record_path in sorted((MANIFEST_DIR / stage).glob("*.json")):
+            with record_path.open(encoding="utf-8") as f:
+                record = json.load(f)
+            if record["used_at"] < since:
+                continue
+            stage_report = report.setdefault(stage, {"built": [], "reused": []})
+            stage_report["built" if record["built_at"] >= since else "reused"].append(
+                record_path.stem
+            )
+    return report
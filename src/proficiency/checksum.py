@@ -1,16 +1,105 @@
+from collections.abc import Iterable
+from pathlib import Path
+
+from .build_manifest import FileRecord
+
+CHECKSUM_PATH = Path("build/sha256.json")
+# size, modification time and digest of hashed files
+CHECKSUM_MANIFEST_PATH = Path("build/sha256_manifest.json")
+
+
+def hash_files(
+    paths: Iterable[Path],
+    cached_records: dict[str, FileRecord] | None = None,
+    workers: int | None = None,
+) -> dict[str, FileRecord]:
+    """
+    Hash files in a thread pool, files that have the same size and modification
+    time as their cached records are not hashed again.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .build_manifest import file_record
+
+    cached_records = cached_records or {}
+    paths = list(paths)
+    with ThreadPoolExecutor(workers) as executor:
+        records = executor.map(
+            lambda path: file_record(path, cached_records.get(str(path))), paths
+        )
+        return {str(path): record for path, record in zip(paths, records)}
+
+
+def load_json(path: Path) -> dict:
+    import json
+
+    if not path.is_file():
+        return {}
+    with path.open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_json(path: Path, data: dict) -> None:
+    import json
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def verify_checksum(
+    folder: Path, checksum_path: Path, workers: int | None = None
+) -> list[str]:
+    """
+    Hash files in `folder` listed in the checksum file, return names of missing
+    files and files that have different digests.
+    """
+    checksum = load_json(checksum_path)
+    paths = {path.name: path for path in folder.glob("**/*.bz2")}
+    failed_names = sorted(checksum.keys() - paths.keys())
+    records = hash_files(
+        (paths[name] for name in checksum.keys() & paths.keys()), workers=workers
+    )
+    for path_str, record in records.items():
+        name = Path(path_str).name
+        if record["sha256"] != checksum[name]:
+            failed_names.append(name)
+    return failed_names
+
+
 def main():
-    import hashlib
+    import argparse
     import json
     import subprocess
     import sys
-    from pathlib import Path
 
-    tag = sys.argv[1]
+    parser = argparse.ArgumentParser()
+    parser.add_argument("tag", help="GitHub release tag or build folder")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="check files of the build folder with the checksum file",
+    )
+    parser.add_argument(
+        "--checksum-file", type=Path, default=CHECKSUM_PATH, help="sha256.json path"
+    )
+    parser.add_argument("--workers", type=int, help="number of hashing threads")
+    args = parser.parse_args()
+
+    tag = args.tag
+    if args.verify:
+        failed_names = verify_checksum(Path(tag), args.checksum_file, args.workers)
+        for name in failed_names:
+            print(f"{name}: FAILED", file=sys.stderr)
+        sys.exit(1 if len(failed_names) > 0 else 0)
+
     checksum = {}
     if Path(tag).is_dir():
-        for bz2_path in Path(tag).glob("**/*.bz2"):
-            with bz2_path.open("rb", buffering=0) as f:
-                checksum[bz2_path.name] = hashlib.file_digest(f, "sha256").hexdigest()
+        manifest = load_json(CHECKSUM_MANIFEST_PATH)
+        records = hash_files(Path(tag).glob("**/*.bz2"), manifest, args.workers)
+        for path_str, record in records.items():
+            checksum[Path(path_str).name] = record["sha256"]
+        save_json(CHECKSUM_MANIFEST_PATH, manifest | records)
     else:
         p = subprocess.run(
             ["gh", "release", "view", tag, "--json", "assets"],
@@ -23,8 +112,4 @@ def main():
             if asset["name"].endswith(".bz2"):
                 checksum[asset["name"]] = asset["digest"].removeprefix("sha256:")
 
-    out_path = Path("build/sha256.json")
-    if not out_path.parent.is_dir():
-        out_path.parent.mkdir()
-    with out_path.open("w", encoding="utf-8") as f:
-        json.dump(checksum, f, indent=2, sort_keys=True)
+    save_json(args.checksum_file, checksum)
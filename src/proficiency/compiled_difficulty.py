@@ -0,0 +1,95 @@
+import json
+import os
+from functools import cache
+from pathlib import Path
+
+from .sorted_table import read_sorted_table, write_sorted_table
+from .util import difficulty_data_path
+
+COMPILED_DIFFICULTY_DIR = Path("build/difficulty")
+
+
+def compiled_difficulty_path(lemma_lang: str) -> Path:
+    return COMPILED_DIFFICULTY_DIR / f"{lemma_lang}.sst"
+
+
+def compile_difficulty(lemma_lang: str) -> Path | None:
+    """
+    Convert the packaged difficulty JSON file to a compact sorted table file if
+    the file is missing or older than the JSON file. Values of English lemmas are
+    difficulty and the enabled sense id, other languages only have difficulty.
+    """
+    json_path = difficulty_data_path(lemma_lang)
+    if not json_path.is_file():
+        return None
+    json_path = Path(str(json_path))
+    compiled_path = compiled_difficulty_path(lemma_lang)
+    if (
+        compiled_path.exists()
+        and compiled_path.stat().st_mtime_ns >= json_path.stat().st_mtime_ns
+    ):
+        return compiled_path
+
+    with json_path.open(encoding="utf-8") as f:
+        data = json.load(f)
+    compiled_path.parent.mkdir(parents=True, exist_ok=True)
+    # workers could compile the same file, replace the file atomically
+    tmp_path = compiled_path.with_suffix(f".{os.getpid()}.tmp")
+    write_sorted_table(
+        tmp_path,
+        (
+            (word, values[:2] if lemma_lang == "en" else [values])
+            for word, values in data.items()
+        ),
+    )
+    tmp_path.replace(compiled_path)
+    return compiled_path
+
+
+class CompiledDifficulty:
+    """
+    Difficulty of each word loaded from the compiled file to a dict, the file is a
+    cache of the packaged JSON file that is faster to load.
+    """
+
+    def __init__(self, path: Path) -> None:
+        keys, self.value_offsets, self.values = read_sorted_table(path)
+        self.difficulties: dict[str, int] = {
+            key: self.values[value_offset]
+            for key, value_offset in zip(keys, self.value_offsets)
+        }
+
+    def __len__(self) -> int:
+        return len(self.difficulties)
+
+    def difficulty(self, word: str) -> int | None:
+        return self.difficulties.get(word)
+
+    def sense_ids(self) -> set[int]:
+        # only English file has sense ids
+        return {self.values[offset + 1] for offset in self.value_offsets[:-1]}
+
+
+@cache
+def load_compiled_difficulty(lemma_lang: str) -> CompiledDifficulty | None:
+    "Compile then load the difficulty file once in each process."
+    compiled_path = compile_difficulty(lemma_lang)
+    return None if compiled_path is None else CompiledDifficulty(compiled_path)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from .util import load_difficulty_data
+
+    lemma_lang = sys.argv[1] if len(sys.argv) > 1 else "en"
+    compile_difficulty(lemma_lang)
+
+    start_time = time.perf_counter()
+    load_difficulty_data(lemma_lang)
+    print(f"load JSON: {(time.perf_counter() - start_time) * 1000:.3f}ms")
+
+    start_time = time.perf_counter()
+    load_compiled_difficulty(lemma_lang)
+    print(f"load compiled file: {(time.perf_counter() - start_time) * 1000:.3f}ms")
@@ -0,0 +1,32 @@
+import logging
+import os
+from datetime import UTC, date, datetime
+from importlib.metadata import version
+
+VERSION = version("proficiency")
+MAJOR_VERSION = VERSION.split(".")[0]
+
+logger = logging.getLogger("proficiency")
+
+
+def configure_logging() -> None:
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)s: %(message)s", level=logging.INFO
+    )
+
+
+def source_date_epoch() -> int | None:
+    """
+    Timestamp of reproducible builds, files created with the same inputs and
+    timestamp have the same bytes.
+    https://reproducible-builds.org/specs/source-date-epoch/
+    """
+    value = os.environ.get("SOURCE_DATE_EPOCH")
+    return None if value is None else int(value)
+
+
+def build_date() -> date:
+    timestamp = source_date_epoch()
+    if timestamp is None:
+        return date.today()
+    return datetime.fromtimestamp(timestamp, UTC).date()
@@ -1,6 +1,5 @@
 import base64
 import sqlite3
-from datetime import date
 from pathlib import Path
 
 from .util import remove_full_stop
@@ -23,6 +22,8 @@ def kaikki_to_kindle_pos_id(pos: str) -> int:
 def create_klld_tables(
     conn: sqlite3.Connection, lemma_lang: str, gloss_lang: str
 ) -> None:
+    from .config import build_date
+
     conn.executescript(
         """
     CREATE TABLE `pos_types` (
@@ -81,7 +82,7 @@ def create_klld_tables(
         "definitionLanguage": gloss_lang,
         "id": "kll.en.zh",
         "lemmaLanguage": lemma_lang,
-        "version": date.today().isoformat(),
+        "version": build_date().isoformat(),
         "revision": "57",
         "tokenSeparator": None,
         "encoding": "1",
@@ -169,6 +170,6 @@ def remove_rtl_pdi(text: str) -> str:
 
 
 def get_klld_filename(lemma_lang: str, gloss_lang: str) -> str:
-    from .main import MAJOR_VERSION
+    from .config import MAJOR_VERSION
 
     return f"kll.{lemma_lang}.{gloss_lang}_v{MAJOR_VERSION}.klld"
@@ -3,7 +3,7 @@ from pathlib import Path
 
 
 def wiktionary_db_path(lemma_lang: str, gloss_lang: str) -> Path:
-    from .main import MAJOR_VERSION
+    from .config import MAJOR_VERSION
 
     return Path(
         f"build/{lemma_lang}/wiktionary_{lemma_lang}_{gloss_lang}_v{MAJOR_VERSION}.db"
@@ -61,3 +61,10 @@ def create_indexes_then_close(conn: sqlite3.Connection, lemma_lang: str) -> None
             print(f"{lemma_lang}: {lemma_num}")
     conn.commit()
     conn.close()
+
+
+def create_lookup_files(db_path: Path, lemma_lang: str) -> list[Path]:
+    from .phrase_matcher import build_automaton
+    from .sorted_table import build_form_table
+
+    return [build_automaton(db_path, lemma_lang), build_form_table(db_path)]
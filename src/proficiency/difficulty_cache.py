@@ -0,0 +1,83 @@
+import sqlite3
+from pathlib import Path
+
+from .util import FREQ_DIFFICULTY_VERSION, freq_to_difficulty
+
+DIFFICULTY_CACHE_PATH = Path("build/difficulty_cache.db")
+
+
+class DifficultyCache:
+    """
+    Difficulty values calculated from wordfreq are saved in a SQLite database in
+    the build folder shared by all gloss languages and builds. Values are keyed
+    by the wordfreq version and `FREQ_DIFFICULTY_VERSION`, upgrading wordfreq or
+    changing `freq_to_difficulty()` doesn't use old values.
+    """
+
+    def __init__(
+        self,
+        lemma_lang: str,
+        cache_path: Path = DIFFICULTY_CACHE_PATH,
+        wordfreq_version: str | None = None,
+        algorithm_version: int = FREQ_DIFFICULTY_VERSION,
+    ) -> None:
+        if wordfreq_version is None:
+            from importlib.metadata import version
+
+            wordfreq_version = version("wordfreq")
+        self.lemma_lang = lemma_lang
+        self.wordfreq_version = wordfreq_version
+        self.algorithm_version = algorithm_version
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # workers of different lemma languages could write at the same time
+        self.conn = sqlite3.connect(cache_path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS freq_difficulty (
+            lemma_lang TEXT, word TEXT, wordfreq_version TEXT,
+            algorithm_version INTEGER, disabled INTEGER, difficulty INTEGER,
+            PRIMARY KEY(lemma_lang, word, wordfreq_version, algorithm_version))
+            WITHOUT ROWID
+            """)
+        self.values: dict[str, tuple[bool, int]] = {}
+        self.new_values: dict[str, tuple[bool, int]] = {}
+
+    def prefetch(self) -> None:
+        "Load all saved values of the language in one query."
+        for word, disabled, difficulty in self.conn.execute(
+            """
+            SELECT word, disabled, difficulty FROM freq_difficulty
+            WHERE lemma_lang = ? AND wordfreq_version = ? AND algorithm_version = ?
+            """,
+            (self.lemma_lang, self.wordfreq_version, self.algorithm_version),
+        ):
+            self.values[word] = (bool(disabled), difficulty)
+
+    def difficulty(self, word: str) -> tuple[bool, int]:
+        "Same as `freq_to_difficulty()`."
+        value = self.values.get(word)
+        if value is None:
+            value = freq_to_difficulty(word, self.lemma_lang)
+            self.values[word] = value
+            self.new_values[word] = value
+        return value
+
+    def close(self) -> None:
+        "Save new values then close the database."
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO freq_difficulty VALUES(?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        self.lemma_lang,
+                        word,
+                        self.wordfreq_version,
+                        self.algorithm_version,
+                        disabled,
+                        difficulty,
+                    )
+                    for word, (disabled, difficulty) in self.new_values.items()
+                ),
+            )
+        self.conn.close()
+        self.new_values.clear()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import json
+import sqlite3
+from pathlib import Path
+
+"""
+Update "kindle_enabled_lemmas.json" with difficulty values of Word Wise
+LanguageLayer.en.ASIN.kll files and the SD-AP values of the paper
+"Estimating the prevalence and diversity of words in written language" by
+Johns, B. T., Dye, M., & Jones, M. N.
+http://btjohns.com/pubs/JDJ_QJEP_2020.pdf
+http://btjohns.com/JDJ_Prev_supp.xlsx
+
+Get 'difficulty' from the language layer files, get 'lemma', 'sense_id' and
+'pos_type' from the kll.en.en.klld file. Layer files are attached to the klld
+database in batches and each batch is joined in one query in a process pool.
+"""
+
+type LayerLemma = tuple[str, int, int, str, int]
+
+
+def query_layer_batch(klld_path: str, layer_paths: list[str]) -> list[LayerLemma]:
+    """
+    Return `(lemma, difficulty, sense_id, pos_type, layer_index)` of the sense that
+    has the highest difficulty in all layer files of the batch for each lemma,
+    the first layer file and the smallest sense id win ties.
+    """
+    conn = sqlite3.connect(f"file:{klld_path}?mode=ro", uri=True)
+    layer_queries = []
+    for index, layer_path in enumerate(layer_paths):
+        conn.execute(f"ATTACH DATABASE ? AS layer_{index}", (layer_path,))
+        layer_queries.append(
+            f"""
+            SELECT sense_id, max(difficulty) AS difficulty, {index} AS layer_index
+            FROM layer_{index}.glosses GROUP BY sense_id
+            """
+        )
+    rows = conn.execute(f"""
+        SELECT lemma, difficulty, sense_id, label, layer_index FROM (
+          SELECT lemma, difficulty, sense_id, pos_types.label, layer_index,
+          row_number() OVER (
+            PARTITION BY lemma ORDER BY difficulty DESC, layer_index, sense_id
+          ) AS rank
+          FROM ({" UNION ALL ".join(layer_queries)}) AS layer_senses
+          JOIN senses ON senses.id = layer_senses.sense_id
+          JOIN lemmas ON display_lemma_id = lemmas.id
+          JOIN pos_types ON pos_types.id = senses.pos_type
+          WHERE (full_def IS NOT NULL OR short_def IS NOT NULL)
+          AND lemma NOT LIKE '-%'
+        )
+        WHERE rank = 1
+        """).fetchall()
+    conn.close()
+    return rows
+
+
+def ingest_layers(
+    lemmas: dict[str, list],
+    klld_path: str,
+    layer_paths: list[str],
+    workers: int | None = None,
+) -> tuple[int, int]:
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+
+    layer_paths = [path for path in layer_paths if Path(path).is_file()]
+    conn = sqlite3.connect(klld_path)
+    batch_size = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    conn.close()
+    batches = [
+        layer_paths[start : start + batch_size]
+        for start in range(0, len(layer_paths), batch_size)
+    ]
+    # (difficulty, -layer_index, -sense_id, pos_type) of each lemma's best sense
+    best_senses: dict[str, tuple[int, int, int, str]] = {}
+    with ProcessPoolExecutor(
+        workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        for batch_index, rows in enumerate(
+            executor.map(partial(query_layer_batch, klld_path), batches)
+        ):
+            print(f"Processed {len(batches[batch_index])} layer files")
+            layer_start = batch_index * batch_size
+            for lemma, difficulty, sense_id, pos_type, layer_index in rows:
+                sense = (difficulty, -(layer_start + layer_index), -sense_id, pos_type)
+                if lemma not in best_senses or sense[:3] > best_senses[lemma][:3]:
+                    best_senses[lemma] = sense
+
+    added_count = 0
+    updated_count = 0
+    for lemma, (difficulty, _, negative_sense_id, pos_type) in best_senses.items():
+        if lemma not in lemmas:
+            added_count += 1
+        elif lemmas[lemma][0] < difficulty:
+            updated_count += 1
+        else:
+            continue
+        lemmas[lemma] = [difficulty, -negative_sense_id, pos_type]
+    return added_count, updated_count
+
+
+# Convert the semantic diversity-author prevalence(SD-AP) value to difficulty
+def sd_ap_to_difficulty(sd_ap: float) -> int | None:
+    if sd_ap >= 5:
+        return None  # simple word, disabled
+    elif sd_ap >= 4:
+        return 5
+    elif sd_ap >= 3:
+        return 4
+    elif sd_ap >= 2:
+        return 3
+    elif sd_ap >= 1:
+        return 2
+    else:
+        return 1
+
+
+def ingest_sd_ap(
+    lemmas: dict[str, list], klld_path: str, csv_path: str
+) -> tuple[int, int, int]:
+    conn = sqlite3.connect(klld_path)
+    conn.create_function("py_lower", 1, str.lower, deterministic=True)
+    conn.execute("CREATE TEMP TABLE sd_ap (word TEXT PRIMARY KEY, difficulty INTEGER)")
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        conn.executemany(
+            "INSERT OR REPLACE INTO sd_ap VALUES(?, ?)",
+            (
+                (row[0], sd_ap_to_difficulty(float(row[-1])))
+                for row in csv.reader(f)
+                if row and row[0] and row[-1]
+            ),
+        )
+
+    added_count = 0
+    updated_count = 0
+    removed_count = 0
+    for lemma, sense_id, pos_type, difficulty in conn.execute("""
+        SELECT lemma, senses.id, pos_types.label, sd_ap.difficulty
+        FROM senses
+        JOIN lemmas ON display_lemma_id = lemmas.id
+        JOIN pos_types ON pos_types.id = senses.pos_type
+        JOIN sd_ap ON sd_ap.word = py_lower(lemma)
+        WHERE (full_def IS NOT NULL OR short_def IS NOT NULL) AND lemma NOT LIKE '-%'
+        ORDER BY lemma, senses.id
+        """):
+        if difficulty is None:
+            if lemmas.pop(lemma, None) is not None:
+                removed_count += 1
+        elif lemma not in lemmas:
+            lemmas[lemma] = [difficulty, sense_id, pos_type]
+            added_count += 1
+        elif lemmas[lemma][0] < difficulty:
+            lemmas[lemma][0] = difficulty
+            updated_count += 1
+    conn.close()
+    return added_count, updated_count, removed_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("klld", help="path of kll.en.en.klld file.")
+    parser.add_argument(
+        "language_layers", nargs="*", help="path of LanguageLayer.en.ASIN.kll files."
+    )
+    parser.add_argument("--sd-ap", help="path of SD-AP CSV file exported from Excel.")
+    parser.add_argument(
+        "--lemmas-json",
+        type=Path,
+        default=Path(__file__).with_name("kindle_enabled_lemmas.json"),
+    )
+    parser.add_argument("--workers", type=int, help="number of processes.")
+    args = parser.parse_args()
+
+    if not Path(args.klld).is_file():
+        raise FileNotFoundError(args.klld)
+    with args.lemmas_json.open(encoding="utf-8") as f:
+        lemmas = json.load(f)
+    origin_count = len(lemmas)
+
+    if len(args.language_layers) > 0:
+        added_count, updated_count = ingest_layers(
+            lemmas, args.klld, args.language_layers, args.workers
+        )
+        print(f"language layers: added {added_count}, updated {updated_count}")
+    # simple words of SD-AP are removed after adding language layers
+    if args.sd_ap is not None:
+        added_count, updated_count, removed_count = ingest_sd_ap(
+            lemmas, args.klld, args.sd_ap
+        )
+        print(
+            f"SD-AP: added {added_count}, updated {updated_count}, "
+            f"removed {removed_count}"
+        )
+
+    print(f"{args.lemmas_json.name} has {len(lemmas)} lemmas, was {origin_count}")
+    with args.lemmas_json.open("w", encoding="utf-8") as f:
+        json.dump(lemmas, f, indent=2, sort_keys=True, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
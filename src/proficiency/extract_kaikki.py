@@ -3,18 +3,27 @@ import re
 import sqlite3
 import subprocess
 from collections import defaultdict
+from collections.abc import Callable, Collection, Iterable, Iterator
 from dataclasses import dataclass, field
+from functools import lru_cache, partial
 from pathlib import Path
 from shutil import which
 from typing import Any
 
-from .database import create_indexes_then_close, init_db, wiktionary_db_path
+from .compiled_difficulty import CompiledDifficulty, load_compiled_difficulty
+from .database import (
+    create_indexes_then_close,
+    create_lookup_files,
+    init_db,
+    wiktionary_db_path,
+)
+from .difficulty_cache import DifficultyCache
 from .languages import KAIKKI_TRANSLATED_GLOSS_LANGS
 from .util import (
-    freq_to_difficulty,
     get_short_def,
     get_shortest_lemma_length,
-    load_difficulty_data,
+    get_t2s_converter,
+    iter_in_thread,
     remove_colon,
     remove_full_stop,
 )
@@ -58,163 +67,283 @@ class Sense:
     examples: list[Example] = field(default_factory=list)
 
 
-def download_kaikki_json(lemma_lang: str, gloss_lang: str) -> None:
-    from .split_jsonl import split_kaikki_jsonl
+def download_kaikki_json(
+    edition: str,
+    translated_lemma_langs: Collection[str] = (),
+    force_stages: Collection[str] = (),
+) -> None:
+    """
+    Download and split the Kaikki file of the edition, lines of
+    `translated_lemma_langs` that have translations are also split to the files
+    of translated gloss languages.
+    """
+    from .build_manifest import BuildStep, run_step
 
     url = "https://kaikki.org/"
-    if gloss_lang == "en" or (
-        gloss_lang in KAIKKI_TRANSLATED_GLOSS_LANGS and lemma_lang == "en"
-    ):
-        url += "dictionary/"
-    else:
-        url += f"{gloss_lang}wiktionary/"
+    url += "dictionary/" if edition == "en" else f"{edition}wiktionary/"
     url += "raw-wiktextract-data.jsonl.gz"
 
-    gz_path = Path(f"build/{gloss_lang}.jsonl.gz")
+    gz_path = Path(f"build/{edition}.jsonl.gz")
     if not gz_path.exists():
+        from .trace import trace_span
+
         gz_path.parent.mkdir(exist_ok=True)
-        subprocess.run(
-            ["wget", "-nv", "-O", str(gz_path), url],
-            check=True,
-            capture_output=True,
-            text=True,
-        )
+        with trace_span("download", gz_path.name):
+            subprocess.run(
+                ["wget", "-nv", "-O", str(gz_path), url],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
     if gz_path.exists():
-        if which("pigz") is None and which("gzip") is None:
-            import gzip
-
-            with gzip.open(gz_path, "rb") as gz_f:
-                split_kaikki_jsonl(gz_f, lemma_lang, gloss_lang)
-        else:
-            command_args = ["pigz" if which("pigz") is not None else "gzip", "-d", "-c"]
-            command_args.append(str(gz_path))
-            sub_p = subprocess.Popen(command_args, stdout=subprocess.PIPE)
-            if sub_p.stdout is not None:
-                with sub_p.stdout as f:
-                    split_kaikki_jsonl(f, lemma_lang, gloss_lang)
-            sub_p.wait()
-
-
-def load_data(lemma_lang: str, gloss_lang: str) -> tuple[Path, dict[str, int]]:
-    kaikki_json_path = Path(f"build/{lemma_lang}/{lemma_lang}_{gloss_lang}.jsonl")
+        translated_lemma_langs = sorted(translated_lemma_langs)
+        run_step(
+            BuildStep(
+                "split",
+                edition,
+                [gz_path],
+                {"translated_lemma_langs": translated_lemma_langs},
+            ),
+            partial(split_kaikki_gz, gz_path, edition, translated_lemma_langs),
+            force_stages,
+        )
+
+
+def split_kaikki_gz(
+    gz_path: Path, edition: str, translated_lemma_langs: Collection[str] = ()
+) -> list[Path]:
+    from .split_jsonl import split_kaikki_jsonl
+
+    if which("pigz") is None and which("gzip") is None:
+        import gzip
+
+        with gzip.open(gz_path, "rb") as gz_f:
+            return split_kaikki_jsonl(gz_f, edition, translated_lemma_langs)
+
+    command_args = ["pigz" if which("pigz") is not None else "gzip", "-d", "-c"]
+    command_args.append(str(gz_path))
+    sub_p = subprocess.Popen(command_args, stdout=subprocess.PIPE)
+    out_paths = []
+    if sub_p.stdout is not None:
+        with sub_p.stdout as f:
+            out_paths = split_kaikki_jsonl(f, edition, translated_lemma_langs)
+    # files split from a truncated or corrupt gz file are not saved to the manifest
+    if sub_p.wait() != 0:
+        raise subprocess.CalledProcessError(sub_p.returncode, command_args)
+    return out_paths
+
+
+def kaikki_dump_edition(lemma_lang: str, gloss_lang: str) -> str:
+    """
+    Wiktionary edition of the Kaikki file, translated glosses of English lemmas
+    come from the English edition.
+    """
+    if gloss_lang == "en" or (
+        gloss_lang in KAIKKI_TRANSLATED_GLOSS_LANGS and lemma_lang == "en"
+    ):
+        return "en"
+    return gloss_lang
+
+
+def kaikki_json_path(lemma_lang: str, gloss_lang: str) -> Path:
     if gloss_lang in KAIKKI_TRANSLATED_GLOSS_LANGS:
-        kaikki_json_path = Path(f"build/{lemma_lang}/{lemma_lang}_{lemma_lang}.jsonl")
+        # shared by all translated gloss languages of the same edition, split
+        # from the edition's file with its other lemma languages
+        return translated_json_path(
+            lemma_lang, kaikki_dump_edition(lemma_lang, gloss_lang)
+        )
+    return Path(f"build/{lemma_lang}/{lemma_lang}_{gloss_lang}.jsonl")
 
-    difficulty_data = load_difficulty_data(lemma_lang)
-    return kaikki_json_path, difficulty_data
 
+def translated_json_path(lemma_lang: str, edition: str) -> Path:
+    return Path(f"build/{lemma_lang}/{lemma_lang}_{edition}_translated.jsonl")
 
-def create_lemmas_db_from_kaikki(lemma_lang: str, gloss_lang: str) -> list[Path]:
-    kaikki_json_path, difficulty_data = load_data(lemma_lang, gloss_lang)
 
-    db_path = wiktionary_db_path(lemma_lang, gloss_lang)
-    conn = init_db(db_path)
-    if gloss_lang == "zh":
-        zh_cn_db_path = wiktionary_db_path(lemma_lang, "zh_cn")
-        zh_cn_conn = init_db(zh_cn_db_path)
+def load_data(
+    lemma_lang: str, gloss_lang: str
+) -> tuple[Path, CompiledDifficulty | None]:
+    compiled_difficulty = load_compiled_difficulty(lemma_lang)
+    return kaikki_json_path(lemma_lang, gloss_lang), compiled_difficulty
 
-    len_limit = get_shortest_lemma_length(lemma_lang)
-    if lemma_lang == "zh" or gloss_lang == "zh":
-        import opencc
 
-        converter = opencc.OpenCC("t2s.json")
+@dataclass
+class LemmasDb:
+    "Database of a gloss language and the IDs inserted for the current word."
+
+    gloss_lang: str
+    conn: sqlite3.Connection
+    zh_cn_conn: sqlite3.Connection | None = None
+    last_word: str = ""
+    form_group_ids: dict[str, int] = field(default_factory=dict)
+    sound_ids: dict[str, int] = field(default_factory=dict)
+
+    # connections that share form and sound rows
+    conns: list[sqlite3.Connection] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.conns = [self.conn]
+        if self.zh_cn_conn is not None:
+            self.conns.append(self.zh_cn_conn)
 
-    last_word = ""
-    form_group_ids: dict[str, int] = {}
-    sound_ids: dict[str, int] = {}
+
+@dataclass
+class LemmaEntry:
+    word: str
+    pos: str
+    difficulty: int
+    forms: set[str]
+    ipas: dict[str, str]
+    # senses of each gloss language
+    senses: list[list[Sense]]
+    # simplified Chinese senses of the "zh" gloss language
+    zh_cn_senses: list[Sense] = field(default_factory=list)
+
+
+def create_lemmas_db_from_kaikki(lemma_lang: str, gloss_lang: str) -> list[Path]:
+    return create_lemmas_dbs_from_kaikki(lemma_lang, [gloss_lang])[gloss_lang]
+
+
+def create_lemmas_dbs_from_kaikki(
+    lemma_lang: str, gloss_langs: list[str]
+) -> dict[str, list[Path]]:
+    """
+    Create databases of gloss languages that use the same JSONL file, translated
+    gloss languages of a lemma language are created in one pass.
+    """
+    kaikki_json_path, compiled_difficulty = load_data(lemma_lang, gloss_langs[0])
+
+    dbs = []
+    for gloss_lang in gloss_langs:
+        dbs.append(
+            LemmasDb(
+                gloss_lang,
+                init_db(wiktionary_db_path(lemma_lang, gloss_lang)),
+                init_db(wiktionary_db_path(lemma_lang, "zh_cn"))
+                if gloss_lang == "zh"
+                else None,
+            )
+        )
+
+    freq_cache = None
+    if compiled_difficulty is None:
+        freq_cache = DifficultyCache(lemma_lang)
+        freq_cache.prefetch()
+
+    # read lines, create entries and insert them to databases in three threads
     with open(kaikki_json_path, encoding="utf-8") as f:
-        for line in f:
-            data = json.loads(line)
-            word = data.get("word", "")
-            pos = data.get("pos", "")
-            if (
-                pos not in USED_POS_TYPES
-                or len(word) < len_limit
-                or re.match(r"\W|\d", word)
-                or (
-                    gloss_lang in KAIKKI_TRANSLATED_GLOSS_LANGS
-                    and len(data.get("translations", [])) == 0
-                )
-                or len(set(data.get("tags", [])).intersection(FILTER_SENSE_TAGS)) > 0
-            ):
-                continue
-            if last_word != word:
-                form_group_ids.clear()
-                sound_ids.clear()
-
-            enabled = True
-            difficulty = 1
-            if difficulty_data:
-                if word in difficulty_data:
-                    difficulty = difficulty_data[word]
-                else:
-                    enabled = False
+        for entry in iter_in_thread(
+            iter_lemma_entries(
+                iter_in_thread(f),
+                lemma_lang,
+                gloss_langs,
+                compiled_difficulty,
+                freq_cache,
+            )
+        ):
+            insert_entry(dbs, entry)
+
+    if freq_cache is not None:
+        freq_cache.close()
+    db_paths = {}
+    for db in dbs:
+        db_path = wiktionary_db_path(lemma_lang, db.gloss_lang)
+        create_indexes_then_close(db.conn, lemma_lang)
+        db_paths[db.gloss_lang] = [db_path, *create_lookup_files(db_path, lemma_lang)]
+        if db.zh_cn_conn is not None:
+            zh_cn_db_path = wiktionary_db_path(lemma_lang, "zh_cn")
+            create_indexes_then_close(db.zh_cn_conn, "")
+            db_paths[db.gloss_lang].extend(
+                [zh_cn_db_path, *create_lookup_files(zh_cn_db_path, lemma_lang)]
+            )
+    # the JSONL file is kept, it's the output of the reusable split step
+    return db_paths
+
+
+def iter_lemma_entries(
+    lines: Iterable[str],
+    lemma_lang: str,
+    gloss_langs: list[str],
+    compiled_difficulty: CompiledDifficulty | None,
+    freq_cache: DifficultyCache | None,
+) -> Iterator[LemmaEntry]:
+    processor = EntryProcessor(lemma_lang, gloss_langs)
+    for line in lines:
+        data = json.loads(line)
+        word = data.get("word", "")
+        pos = data.get("pos", "")
+        if (
+            pos not in USED_POS_TYPES
+            or len(word) < processor.len_limit
+            or re.match(r"\W|\d", word)
+            or (processor.is_translated and len(data.get("translations", [])) == 0)
+            or len(set(data.get("tags", [])).intersection(FILTER_SENSE_TAGS)) > 0
+        ):
+            continue
+
+        enabled = True
+        difficulty = 1
+        if compiled_difficulty is not None:
+            word_difficulty = compiled_difficulty.difficulty(word)
+            if word_difficulty is not None:
+                difficulty = word_difficulty
             else:
-                disabled_by_freq, difficulty = freq_to_difficulty(word, lemma_lang)
-                if disabled_by_freq:
-                    enabled = False
+                enabled = False
+        elif freq_cache is not None:
+            disabled_by_freq, difficulty = freq_cache.difficulty(word)
+            if disabled_by_freq:
+                enabled = False
+
+        senses = processor.get_senses(data, enabled)
+        if all(len(sense_data) == 0 for sense_data in senses):
+            continue
+        entry = LemmaEntry(
+            word,
+            pos,
+            difficulty,
+            processor.get_forms(word, pos, data.get("forms", [])),
+            get_ipas(lemma_lang, data.get("sounds", [])),
+            senses,
+            processor.get_zh_cn_senses(senses),
+        )
+        yield entry
 
-            forms = get_forms(
-                word, lemma_lang, gloss_lang, data.get("forms", []), pos, len_limit
-            )
-            if lemma_lang == "zh":
-                simplified_form = converter.convert(word)
-                if simplified_form != word:
-                    forms.add(simplified_form)
-
-            sense_data = (
-                get_translated_senses(gloss_lang, data, enabled)
-                if gloss_lang in KAIKKI_TRANSLATED_GLOSS_LANGS
-                else get_senses(lemma_lang, gloss_lang, data, enabled)
+
+def insert_entry(dbs: list[LemmasDb], entry: LemmaEntry) -> None:
+    for db, sense_data in zip(dbs, entry.senses):
+        if db.last_word != entry.word:
+            db.form_group_ids.clear()
+            db.sound_ids.clear()
+        if len(sense_data) == 0:
+            continue
+        form_group_id = insert_forms(db.conns, entry.forms, db.form_group_ids)
+        sound_id = insert_sound(db.conns, entry.ipas, db.sound_ids)
+        insert_senses(
+            db.conn,
+            sense_data,
+            entry.word,
+            entry.pos,
+            entry.difficulty,
+            sound_id,
+            form_group_id,
+        )
+        if db.zh_cn_conn is not None:
+            insert_senses(
+                db.zh_cn_conn,
+                entry.zh_cn_senses,
+                entry.word,
+                entry.pos,
+                entry.difficulty,
+                sound_id,
+                form_group_id,
             )
-            if len(sense_data) > 0:
-                ipas = get_ipas(lemma_lang, data.get("sounds", []))
-                form_group_id = insert_forms(
-                    [conn, zh_cn_conn] if gloss_lang == "zh" else [conn],
-                    forms,
-                    form_group_ids,
-                )
-                sound_id = insert_sound(
-                    [conn, zh_cn_conn] if gloss_lang == "zh" else [conn],
-                    ipas,
-                    sound_ids,
-                )
-                insert_senses(
-                    conn, sense_data, word, pos, difficulty, sound_id, form_group_id
-                )
-                if gloss_lang == "zh":
-                    zh_cn_senses = [
-                        Sense(
-                            enabled=sense.enabled,
-                            short_gloss=converter.convert(sense.short_gloss),
-                            gloss=converter.convert(sense.gloss),
-                            short_example=converter.convert(sense.short_example),
-                        )
-                        for sense in sense_data
-                    ]
-                    insert_senses(
-                        zh_cn_conn,
-                        zh_cn_senses,
-                        word,
-                        pos,
-                        difficulty,
-                        sound_id,
-                        form_group_id,
-                    )
-                last_word = word
-
-    create_indexes_then_close(conn, lemma_lang)
-    if gloss_lang == "zh":
-        create_indexes_then_close(zh_cn_conn, "")
-    kaikki_json_path.unlink()
-    return [db_path, zh_cn_db_path] if gloss_lang == "zh" else [db_path]
+        db.last_word = entry.word
 
 
 def insert_forms(
     conn_list: list[sqlite3.Connection], forms: set[str], form_group_ids: dict[str, int]
-) -> int | None:
-    if len(forms) == 0:
-        return None
+) -> int:
+    # lemmas without forms have an empty form group, all lemmas are found by the
+    # form group id
     form_key = "_".join(sorted(forms))
     if form_key in form_group_ids:
         return form_group_ids[form_key]
@@ -225,7 +354,8 @@ def insert_forms(
         ):
             conn.executemany(
                 "INSERT OR IGNORE INTO forms (form, form_group_id) VALUES(?, ?)",
-                ((form, form_group_id) for form in forms),
+                # sorted for reproducible row order
+                ((form, form_group_id) for form in sorted(forms)),
             )
             form_group_ids[form_key] = form_group_id
     return form_group_id
@@ -367,10 +497,11 @@ def czech_adjective_to_adverb(word: str) -> str | None:
         return None
 
 
-def get_czech_derived_adverb_forms(adj: str) -> set[str]:
+@lru_cache(maxsize=1 << 16)
+def get_czech_derived_adverb_forms(adj: str) -> frozenset[str]:
     adverb = czech_adjective_to_adverb(adj)
     if adverb is None:
-        return set()
+        return frozenset()
     else:
         derived_base_forms = {adverb}
         if not adverb.startswith("ne"):  # Negated form
@@ -381,47 +512,97 @@ def get_czech_derived_adverb_forms(adj: str) -> set[str]:
                 final_derived_forms.add(adv + "ji")
                 final_derived_forms.add("nej" + adv + "ji")
         final_derived_forms |= derived_base_forms
-        return final_derived_forms
-
-
-def get_forms(
-    word: str,
-    lemma_lang: str,
-    gloss_lang: str,
-    forms_data: list[dict[str, Any]],
-    pos: str,
-    len_limit: int,
-) -> set[str]:
-    from wiktextract_lemmatization.utils import remove_accents
-
-    forms: set[str] = set()
-    for form in forms_data:
-        form_str = form.get("form", "")
-        if form_str in ["", word] or len(form_str) < len_limit:
-            continue
-        if gloss_lang == "en" and any(
-            tag in FILTER_EN_FORM_TAGS for tag in form.get("tags", [])
-        ):
-            continue
-        forms.add(form_str)
-
-    if lemma_lang == "cs":
-        if (
-            pos in ["adj", "verb", "adv"]
-            and not word.startswith("ne")
-            and " " not in word
-        ):
-            # Negative form: https://en.wikipedia.org/wiki/Czech_language#Grammar
-            forms |= {f"ne{form}" for form in forms}
-        if pos == "adj":
-            # Wiktionary doesn't have the dual instrumental form in declension tables
-            # https://linguistics.stackexchange.com/questions/48502/what-is-the-behind-the-declension-obrovskýma-in-the-phrase-obrovskýma-očima/48507#48507
-            forms |= {form[:-3] + "ýma" for form in forms if form.endswith("ými")}
-            forms |= get_czech_derived_adverb_forms(word)
-
-    if lemma_lang in ["ru", "uk"]:  # Russian, Ukrainian
-        forms |= {remove_accents(form) for form in forms}
-    return forms
+        return frozenset(final_derived_forms)
+
+
+def add_czech_forms(word: str, pos: str, forms: set[str]) -> None:
+    if pos in ("adj", "verb", "adv") and not word.startswith("ne") and " " not in word:
+        # Negative form: https://en.wikipedia.org/wiki/Czech_language#Grammar
+        forms |= {f"ne{form}" for form in forms}
+    if pos == "adj":
+        # Wiktionary doesn't have the dual instrumental form in declension tables
+        # https://linguistics.stackexchange.com/questions/48502/what-is-the-behind-the-declension-obrovskýma-in-the-phrase-obrovskýma-očima/48507#48507
+        forms |= {form[:-3] + "ýma" for form in forms if form.endswith("ými")}
+        forms |= get_czech_derived_adverb_forms(word)
+
+
+class EntryProcessor:
+    """
+    Language rules of a task's lemma language and gloss languages are resolved
+    once when the processor is created instead of for each entry.
+    """
+
+    def __init__(self, lemma_lang: str, gloss_langs: list[str]) -> None:
+        self.len_limit = get_shortest_lemma_length(lemma_lang)
+        self.is_translated = gloss_langs[0] in KAIKKI_TRANSLATED_GLOSS_LANGS
+        self.sense_functions: list[Callable[[dict[str, Any], bool], list[Sense]]] = [
+            partial(get_translated_senses, gloss_lang)
+            if self.is_translated
+            else partial(get_senses, lemma_lang, gloss_lang)
+            for gloss_lang in gloss_langs
+        ]
+        # forms only depend on the gloss language if it's English, translated
+        # gloss languages share them
+        self.filter_form_tags = gloss_langs[0] == "en"
+        self.form_functions: list[Callable[[str, str, set[str]], None]] = []
+        if lemma_lang == "cs":
+            self.form_functions.append(add_czech_forms)
+        elif lemma_lang in ("ru", "uk"):  # Russian, Ukrainian
+            from wiktextract_lemmatization.utils import remove_accents
+
+            self.remove_accents = lru_cache(maxsize=1 << 16)(remove_accents)
+            self.form_functions.append(self.add_unaccented_forms)
+        elif lemma_lang == "zh":
+            self.form_functions.append(self.add_simplified_form)
+        self.zh_index = gloss_langs.index("zh") if "zh" in gloss_langs else None
+        if lemma_lang == "zh" or self.zh_index is not None:
+            self.converter = get_t2s_converter()
+
+    def get_senses(self, word_data: dict[str, Any], enabled: bool) -> list[list[Sense]]:
+        "Return senses of each gloss language."
+        return [
+            sense_function(word_data, enabled)
+            for sense_function in self.sense_functions
+        ]
+
+    def get_forms(
+        self, word: str, pos: str, forms_data: list[dict[str, Any]]
+    ) -> set[str]:
+        forms: set[str] = set()
+        for form in forms_data:
+            form_str = form.get("form", "")
+            if form_str in ("", word) or len(form_str) < self.len_limit:
+                continue
+            if self.filter_form_tags and not FILTER_EN_FORM_TAGS.isdisjoint(
+                form.get("tags", ())
+            ):
+                continue
+            forms.add(form_str)
+        for form_function in self.form_functions:
+            form_function(word, pos, forms)
+        return forms
+
+    def add_unaccented_forms(self, word: str, pos: str, forms: set[str]) -> None:
+        forms |= {self.remove_accents(form) for form in forms}
+
+    def add_simplified_form(self, word: str, pos: str, forms: set[str]) -> None:
+        simplified_form = self.converter.convert(word)
+        if simplified_form != word:
+            forms.add(simplified_form)
+
+    def get_zh_cn_senses(self, senses: list[list[Sense]]) -> list[Sense]:
+        "Convert senses of the Chinese gloss language to simplified Chinese."
+        if self.zh_index is None:
+            return []
+        return [
+            Sense(
+                enabled=sense.enabled,
+                short_gloss=self.converter.convert(sense.short_gloss),
+                gloss=self.converter.convert(sense.gloss),
+                short_example=self.converter.convert(sense.short_example),
+            )
+            for sense in senses[self.zh_index]
+        ]
 
 
 def get_translated_senses(
@@ -510,3 +691,77 @@ def get_examples(examples: dict, gloss_lang: str) -> tuple[str, list[Example]]:
                 Example(text=example_text, offsets=json.dumps(offsets))
             )
     return short_example, e_with_offsets
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    def old_get_forms(
+        word: str,
+        lemma_lang: str,
+        gloss_lang: str,
+        forms_data: list[dict[str, Any]],
+        pos: str,
+        len_limit: int,
+    ) -> set[str]:
+        # the function replaced by `EntryProcessor.get_forms()`, remove_accents
+        # was imported for all languages, it's only imported for Russian and
+        # Ukrainian here to run without wiktextract_lemmatization
+        forms: set[str] = set()
+        for form in forms_data:
+            form_str = form.get("form", "")
+            if form_str in ["", word] or len(form_str) < len_limit:
+                continue
+            if gloss_lang == "en" and any(
+                tag in FILTER_EN_FORM_TAGS for tag in form.get("tags", [])
+            ):
+                continue
+            forms.add(form_str)
+
+        if lemma_lang == "cs":
+            if (
+                pos in ["adj", "verb", "adv"]
+                and not word.startswith("ne")
+                and " " not in word
+            ):
+                forms |= {f"ne{form}" for form in forms}
+            if pos == "adj":
+                forms |= {form[:-3] + "ýma" for form in forms if form.endswith("ými")}
+                forms |= get_czech_derived_adverb_forms.__wrapped__(word)
+
+        if lemma_lang in ["ru", "uk"]:
+            from wiktextract_lemmatization.utils import remove_accents
+
+            forms |= {remove_accents(form) for form in forms}
+        return forms
+
+    # Time of creating forms of each entry with the old `get_forms()` and the
+    # processor of the task, Russian and Ukrainian need wiktextract_lemmatization.
+    jsonl_path = Path(sys.argv[1])
+    lemma_lang = sys.argv[2]
+    gloss_lang = sys.argv[3] if len(sys.argv) > 3 else "en"
+    with jsonl_path.open(encoding="utf-8") as f:
+        entries = [
+            (data.get("word", ""), data.get("pos", ""), data.get("forms", []))
+            for data in map(json.loads, f)
+        ]
+
+    start_time = time.perf_counter()
+    len_limit = get_shortest_lemma_length(lemma_lang)
+    old_forms = [
+        old_get_forms(word, lemma_lang, gloss_lang, forms_data, pos, len_limit)
+        for word, pos, forms_data in entries
+    ]
+    elapsed_time = time.perf_counter() - start_time
+    print(f"old get_forms(): {elapsed_time / len(entries) * 1e6:.2f}µs")
+
+    get_czech_derived_adverb_forms.cache_clear()
+    start_time = time.perf_counter()
+    processor = EntryProcessor(lemma_lang, [gloss_lang])
+    new_forms = [
+        processor.get_forms(word, pos, forms_data) for word, pos, forms_data in entries
+    ]
+    elapsed_time = time.perf_counter() - start_time
+    print(f"processor of the task: {elapsed_time / len(entries) * 1e6:.2f}µs")
+    print(f"same forms: {old_forms == new_forms}")
@@ -2,7 +2,7 @@ import csv
 import json
 import re
 import sqlite3
-import sys
+from concurrent.futures import Executor
 from importlib.resources import files
 from itertools import product
 from pathlib import Path
@@ -64,74 +64,159 @@ def transform_lemma(lemma: str) -> set[str]:
         return {lemma}
 
 
-def create_kindle_lemmas_db(db_path: Path) -> None:
+def get_kindle_lemma_forms(lemma: str, lemminflect_pos: str | None) -> set[str]:
+    if "(" in lemma:  # "(as) good as new"
+        forms_with_words_in_parentheses = get_en_lemma_forms(
+            re.sub(r"[()]", "", lemma), lemminflect_pos
+        )
+        forms_without_words_in_parentheses = get_en_lemma_forms(
+            " ".join(re.sub(r"\([^)]+\)", "", lemma).split()),
+            lemminflect_pos,
+        )
+        return forms_with_words_in_parentheses | forms_without_words_in_parentheses
+    return get_en_lemma_forms(lemma, lemminflect_pos)
+
+
+def get_lemma_pos_pairs(rows: list[list[str]]) -> list[tuple[str, str | None]]:
+    return list(
+        dict.fromkeys(
+            (lemma, kindle_to_lemminflect_pos(pos_type))
+            for lemma, pos_type, _, _ in rows
+        )
+    )
+
+
+def inflect_lemmas(
+    lemma_pos_pairs: list[tuple[str, str | None]], executor: Executor | None = None
+) -> dict[tuple[str, str | None], set[str]]:
+    # inflect each distinct (lemma, POS) pair once, in worker processes if possible
+    lemmas = [lemma for lemma, _ in lemma_pos_pairs]
+    pos_tags = [pos for _, pos in lemma_pos_pairs]
+    return dict(
+        zip(
+            lemma_pos_pairs,
+            map(get_kindle_lemma_forms, lemmas, pos_tags)
+            if executor is None
+            else executor.map(get_kindle_lemma_forms, lemmas, pos_tags, chunksize=1000),
+        )
+    )
+
+
+def get_lemma_forms_stamp() -> dict[str, str]:
+    import hashlib
+    from importlib.metadata import PackageNotFoundError, version
+
+    csv_digest = hashlib.sha256(
+        (files("proficiency") / "en" / "kindle_all_lemmas.csv").read_bytes()
+    ).hexdigest()
+    try:
+        lemminflect_version = version("lemminflect")
+    except PackageNotFoundError:
+        lemminflect_version = ""
+    return {"csv_sha256": csv_digest, "lemminflect": lemminflect_version}
+
+
+def load_lemma_forms(
+    lemma_pos_pairs: list[tuple[str, str | None]],
+) -> dict[tuple[str, str | None], set[str]] | None:
+    """
+    Load forms saved by `save_lemma_forms()` if the file is created from the same
+    CSV file and lemminflect version, forms are in the order of `lemma_pos_pairs`.
+    """
+    forms_path = files("proficiency") / "en" / "kindle_lemma_forms.json"
+    if not forms_path.is_file():
+        return None
+    with forms_path.open(encoding="utf-8") as f:
+        data = json.load(f)
+    stamp = get_lemma_forms_stamp()
+    if data["csv_sha256"] != stamp["csv_sha256"] or stamp["lemminflect"] not in (
+        "",
+        data["lemminflect"],
+    ):
+        return None
+    return {
+        pair: set(forms)
+        for pair, forms in zip(lemma_pos_pairs, data["forms"], strict=True)
+    }
+
+
+def save_lemma_forms() -> None:
+    with open("en/kindle_all_lemmas.csv", newline="", encoding="utf-8") as f:
+        lemma_pos_pairs = get_lemma_pos_pairs(list(csv.reader(f)))
+    lemma_forms = inflect_lemmas(lemma_pos_pairs)
+    with open("en/kindle_lemma_forms.json", "w", encoding="utf-8") as f:
+        json.dump(
+            get_lemma_forms_stamp()
+            | {"forms": [sorted(lemma_forms[pair]) for pair in lemma_pos_pairs]},
+            f,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+
+
+def create_kindle_lemmas_db(db_path: Path, executor: Executor | None = None) -> None:
+    from .compiled_difficulty import load_compiled_difficulty
     from .database import create_indexes_then_close, init_db
 
-    with (files("proficiency") / "en" / "kindle_enabled_lemmas.json").open(
-        encoding="utf-8"
-    ) as f:
-        enabled_lemmas = json.load(f)
-    enabled_sense_ids: set[int] = {data[1] for data in enabled_lemmas.values()}
-    conn = init_db(db_path)
+    enabled_lemmas = load_compiled_difficulty("en")
+    if enabled_lemmas is None:
+        raise FileNotFoundError("kindle_enabled_lemmas.json")
+    enabled_sense_ids = enabled_lemmas.sense_ids()
 
     with (files("proficiency") / "en" / "kindle_all_lemmas.csv").open(  # type: ignore
         newline="", encoding="utf-8"
     ) as f:
-        csv_reader = csv.reader(f)
-        forms_id: dict[str, int] = {}
-        last_word = ""
-        for lemma, pos_type, sense_id_str, _ in csv_reader:
-            if lemma != last_word:
-                forms_id.clear()
-            sense_id = int(sense_id_str)
-            enabled = 1 if sense_id in enabled_sense_ids else 0
-            lemminflect_pos = kindle_to_lemminflect_pos(pos_type)
-            difficulty = enabled_lemmas[lemma][0] if lemma in enabled_lemmas else 1
-            en_data = (sense_id, enabled, pos_type, difficulty)
-            insert_en_data(conn, lemma, en_data, lemminflect_pos, forms_id)
-            last_word = lemma
+        rows = list(csv.reader(f))
+
+    lemma_pos_pairs = get_lemma_pos_pairs(rows)
+    lemma_forms = load_lemma_forms(lemma_pos_pairs)
+    if lemma_forms is None:
+        lemma_forms = inflect_lemmas(lemma_pos_pairs, executor)
 
+    senses: list[tuple[int, int, str, int, str, int]] = []
+    form_group_ids: list[tuple[int]] = []
+    forms: list[tuple[str, int]] = []
+    forms_id: dict[str, int] = {}
+    last_word = ""
+    for lemma, pos_type, sense_id_str, _ in rows:
+        if lemma != last_word:
+            forms_id.clear()
+        sense_id = int(sense_id_str)
+        enabled = 1 if sense_id in enabled_sense_ids else 0
+        difficulty = enabled_lemmas.difficulty(lemma) or 1
+        lemma_form_set = lemma_forms[(lemma, kindle_to_lemminflect_pos(pos_type))]
+        forms_key = "_".join(sorted(lemma_form_set))
+        if forms_key in forms_id:
+            form_group_id = forms_id[forms_key]
+        else:
+            form_group_id = len(form_group_ids) + 1
+            form_group_ids.append((form_group_id,))
+            forms_id[forms_key] = form_group_id
+            forms.extend((form, form_group_id) for form in sorted(lemma_form_set))
+        senses.append((sense_id, enabled, pos_type, difficulty, lemma, form_group_id))
+        last_word = lemma
+
+    conn = init_db(db_path)
+    insert_en_data(conn, senses, form_group_ids, forms)
     create_indexes_then_close(conn, "")
 
 
 def insert_en_data(
     conn: sqlite3.Connection,
-    lemma: str,
-    data: tuple[int, int, str, int],
-    lemminflect_pos: str | None,
-    form_ids: dict[str, int],
+    senses: list[tuple[int, int, str, int, str, int]],
+    form_group_ids: list[tuple[int]],
+    forms: list[tuple[str, int]],
 ) -> None:
-    if "(" in lemma:  # "(as) good as new"
-        forms_with_words_in_parentheses = get_en_lemma_forms(
-            re.sub(r"[()]", "", lemma), lemminflect_pos
-        )
-        forms_without_words_in_parentheses = get_en_lemma_forms(
-            " ".join(re.sub(r"\([^)]+\)", "", lemma).split()),
-            lemminflect_pos,
-        )
-        forms = forms_with_words_in_parentheses | forms_without_words_in_parentheses
-    else:
-        forms = get_en_lemma_forms(lemma, lemminflect_pos)
-    forms_key = "_".join(sorted(forms))
-    form_group_id = 0
-    if forms_key in form_ids:
-        form_group_id = form_ids[forms_key]
-    else:
-        for (form_group_id,) in conn.execute(
-            "INSERT INTO form_groups VALUES (NULL) RETURNING id"
-        ):
-            form_ids[forms_key] = form_group_id
-
-    conn.execute(
+    conn.executemany("INSERT INTO form_groups VALUES (?)", form_group_ids)
+    conn.executemany(
         """
         INSERT INTO senses (id, enabled, pos, difficulty, lemma, form_group_id)
         VALUES(?, ?, ?, ?, ?, ?)
         """,
-        data + (lemma, form_group_id),
+        senses,
     )
     conn.executemany(
-        "INSERT OR IGNORE INTO forms (form, form_group_id) VALUES(?, ?)",
-        ((form, form_group_id) for form in forms),
+        "INSERT OR IGNORE INTO forms (form, form_group_id) VALUES(?, ?)", forms
     )
 
 
@@ -156,4 +241,17 @@ def extract_kindle_lemmas(klld_path: str) -> None:
 
 
 if __name__ == "__main__":
-    extract_kindle_lemmas(sys.argv[1])
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("klld_path", nargs="?", help="path of kll.en.en.klld file.")
+    parser.add_argument(
+        "--save-forms",
+        action="store_true",
+        help="save inflections of all lemmas to en/kindle_lemma_forms.json",
+    )
+    args = parser.parse_args()
+    if args.klld_path is not None:
+        extract_kindle_lemmas(args.klld_path)
+    if args.save_forms:
+        save_lemma_forms()
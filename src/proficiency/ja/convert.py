@@ -1,21 +1,84 @@
-def parse_jlpt_page(words: dict[str, int], level: int, title: str) -> None:
+import threading
+from concurrent.futures import Executor, Future
+from pathlib import Path
+
+API_URL = "https://en.wiktionary.org/w/api.php"
+CACHE_DIR = Path.home() / ".cache" / "proficiency" / "jlpt"
+
+type PageItem = tuple[str, str]  # ("word", word) or ("page", subpage title)
+
+
+class PageFetcher:
+    """
+    Download page HTML in a thread pool, each title is only requested once and
+    responses are saved in `cache_dir`.
+    """
+
+    def __init__(
+        self, executor: Executor, api_url: str, cache_dir: Path, refresh: bool = False
+    ) -> None:
+        self.executor = executor
+        self.api_url = api_url
+        self.cache_dir = cache_dir
+        self.refresh = refresh
+        self.futures: dict[str, Future[str]] = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def fetch(self, title: str) -> Future[str]:
+        with self.lock:
+            future = self.futures.get(title)
+            if future is None:
+                future = self.executor.submit(self.load_page, title)
+                self.futures[title] = future
+            return future
+
+    def cache_path(self, title: str) -> Path:
+        from urllib.parse import quote
+
+        return self.cache_dir / f"{quote(title, safe='')}.html"
+
+    def load_page(self, title: str) -> str:
+        cache_path = self.cache_path(title)
+        if not self.refresh and cache_path.is_file():
+            return cache_path.read_text(encoding="utf-8")
+        page_html = self.request_page(title)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{threading.get_ident()}")
+        tmp_path.write_text(page_html, encoding="utf-8")
+        tmp_path.replace(cache_path)
+        return page_html
+
+    def request_page(self, title: str) -> str:
+        import requests
+
+        # one session in each thread to reuse connections
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers["user-agent"] = "proficiency"
+            self.local.session = session
+        r = session.get(
+            self.api_url,
+            params={
+                "format": "json",
+                "formatversion": "2",
+                "action": "parse",
+                "page": title,
+                "prop": "text",
+            },
+        )
+        r.raise_for_status()
+        return r.json().get("parse", {}).get("text", "")
+
+
+def parse_jlpt_page(page_html: str) -> list[PageItem]:
+    """
+    Return words and subpage titles of the page in document order.
+    """
     from xml.etree import ElementTree
 
-    import requests
-
-    r = requests.get(
-        "https://en.wiktionary.org/w/api.php",
-        params={
-            "format": "json",
-            "formatversion": "2",
-            "action": "parse",
-            "page": title,
-            "prop": "text",
-        },
-        headers={"user-agent": "proficiency"},
-    )
-    data = r.json()
-    page_html = data.get("parse", {}).get("text", "")
+    items: list[PageItem] = []
     root = ElementTree.fromstring(page_html)
     for li_tag in root.iterfind(".//li"):
         for span_tag in li_tag.iterfind("span"):
@@ -34,9 +97,49 @@ def parse_jlpt_page(words: dict[str, int], level: int, title: str) -> None:
                             span_text = span_text[: span_text.index(c)].strip()
                             break
                 if len(span_text) > 0:
-                    words[span_text] = level
+                    items.append(("word", span_text))
         for a_tag in li_tag.iterfind("a"):  # N1, N2, N3 subpage
-            parse_jlpt_page(words, level, a_tag.get("title", ""))
+            items.append(("page", a_tag.get("title", "")))
+    return items
+
+
+def collect_words(
+    fetcher: PageFetcher,
+    words: dict[str, int],
+    level: int,
+    title: str,
+    parent_titles: frozenset[str] = frozenset(),
+) -> None:
+    items = parse_jlpt_page(fetcher.fetch(title).result())
+    # request all subpages before waiting for the first one
+    for item_type, value in items:
+        if item_type == "page":
+            fetcher.fetch(value)
+    # words are added in the order of the pages, later words replace earlier ones
+    for item_type, value in items:
+        if item_type == "word":
+            words[value] = level
+        elif value not in parent_titles:
+            collect_words(fetcher, words, level, value, parent_titles | {title})
+
+
+def convert_jlpt(
+    api_url: str = API_URL,
+    cache_dir: Path = CACHE_DIR,
+    workers: int = 8,
+    refresh: bool = False,
+) -> dict[str, int]:
+    from concurrent.futures import ThreadPoolExecutor
+
+    words: dict[str, int] = {}
+    with ThreadPoolExecutor(workers) as executor:
+        fetcher = PageFetcher(executor, api_url, cache_dir, refresh)
+        titles = {level: f"Appendix:JLPT/N{level}" for level in range(1, 6)}
+        for title in titles.values():
+            fetcher.fetch(title)
+        for level, title in titles.items():
+            collect_words(fetcher, words, level, title)
+    return words
 
 
 def main() -> None:
@@ -44,11 +147,21 @@ def main() -> None:
     Convert the Wikitext of pages in https://en.wiktionary.org/wiki/Appendix:JLPT
     to difficulty value
     """
+    import argparse
     import json
 
-    words: dict[str, int] = {}
-    for level in range(1, 6):
-        parse_jlpt_page(words, level, f"Appendix:JLPT/N{level}")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--api-url", default=API_URL, help="MediaWiki API URL")
+    parser.add_argument(
+        "--cache-dir", type=Path, default=CACHE_DIR, help="page cache folder"
+    )
+    parser.add_argument("--workers", type=int, default=8, help="number of threads")
+    parser.add_argument(
+        "--refresh", action="store_true", help="download cached pages again"
+    )
+    args = parser.parse_args()
+
+    words = convert_jlpt(args.api_url, args.cache_dir, args.workers, args.refresh)
     with open("difficulty.json", "w", encoding="utf-8") as f:
         json.dump(words, f, indent=2, ensure_ascii=False, sort_keys=True)
 
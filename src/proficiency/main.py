@@ -1,110 +1,343 @@
 import argparse
-import logging
 import multiprocessing
+import os
 import re
-import tarfile
+import time
 from collections import defaultdict
-from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Collection
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
 from functools import partial
-from importlib.metadata import version
+from importlib.resources import files
 from pathlib import Path
 
-from .create_klld import create_klld_db
-from .extract_kaikki import create_lemmas_db_from_kaikki, download_kaikki_json
+from .archive import create_tar_bz2
+from .build_manifest import STAGES, BuildStep, build_report, run_step
+from .compiled_difficulty import compile_difficulty
+from .config import MAJOR_VERSION, configure_logging, logger, source_date_epoch
+from .database import create_lookup_files
+from .extract_kaikki import (
+    download_kaikki_json,
+    kaikki_dump_edition,
+    kaikki_json_path,
+)
 from .extract_kindle_lemmas import create_kindle_lemmas_db
 from .languages import (
     KAIKKI_GLOSS_LANGS,
     KAIKKI_LEMMA_LANGS,
     KAIKKI_TRANSLATED_GLOSS_LANGS,
 )
-from .wiki_titles import X_RAY_EDITIONS, create_wiki_db
-
-VERSION = version("proficiency")
-MAJOR_VERSION = VERSION.split(".")[0]
-
-logging.basicConfig(format="%(asctime)s %(levelname)s: %(message)s", level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-
-def create_wiktionary_files_from_kaikki(
-    lemma_lang: str, gloss_lang: str = "en"
-) -> list[Path]:
-    if gloss_lang in KAIKKI_TRANSLATED_GLOSS_LANGS:
-        download_kaikki_json(lemma_lang, gloss_lang)
+from .trace import finish_trace, start_trace, trace_span
+from .wiki_titles import X_RAY_EDITIONS
+from .worker import (
+    create_klld_file,
+    create_translated_wiktionary_files,
+    create_wiktionary_files_from_kaikki,
+    create_x_ray_file,
+    init_worker,
+    init_x_ray_worker,
+)
 
-    return create_lemmas_db_from_kaikki(lemma_lang, gloss_lang)
+configure_logging()
 
 
 def main() -> None:
     gloss_languages = KAIKKI_GLOSS_LANGS.keys() | KAIKKI_TRANSLATED_GLOSS_LANGS.keys()
     parser = argparse.ArgumentParser()
-    parser.add_argument("gloss_lang", choices=gloss_languages)
+    parser.add_argument("gloss_langs", nargs="+", choices=gloss_languages)
     parser.add_argument(
         "--lemma-lang-codes",
         nargs="*",
         default=[],
         choices=KAIKKI_LEMMA_LANGS,
+        help="Lemma languages of all gloss languages, "
+        "default is all supported languages",
+    )
+    parser.add_argument(
+        "--force",
+        nargs="*",
+        choices=STAGES,
+        help="Rebuild steps of these stages even if they are not changed, "
+        "rebuild all stages if no stage is given",
+    )
+    parser.add_argument(
+        "--stream-wiki-dumps",
+        action="store_true",
+        help="Parse Wikipedia dump files while downloading, don't save them to disk",
+    )
+    parser.add_argument(
+        "--build-wiki-in-memory",
+        action="store_true",
+        help="Create Wikipedia title databases in memory then save them to disk",
+    )
+    parser.add_argument(
+        "--wiki-page-workers",
+        type=int,
+        default=1,
+        help="Number of processes that parse each Wikipedia page.sql file",
+    )
+    parser.add_argument(
+        "--x-ray-editions",
+        nargs="*",
+        choices=X_RAY_EDITIONS,
+        help="Wikipedia editions of X-ray files, default is the gloss languages",
+    )
+    parser.add_argument(
+        "--x-ray-only", action="store_true", help="Only create X-ray files"
+    )
+    parser.add_argument(
+        "--x-ray-workers", type=int, help="Maximum number of X-ray processes"
+    )
+    parser.add_argument(
+        "--x-ray-memory-limit",
+        type=int,
+        help="Memory limit of each X-ray process in MiB",
+    )
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        help="Write a Chrome trace event file of build steps in all processes",
     )
     args = parser.parse_args()
-    if args.gloss_lang in KAIKKI_TRANSLATED_GLOSS_LANGS:
-        if len(args.lemma_lang_codes) == 0:
-            args.lemma_lang_codes = KAIKKI_TRANSLATED_GLOSS_LANGS[args.gloss_lang]
-        else:
-            for lemma_lang in args.lemma_lang_codes:
-                if lemma_lang not in KAIKKI_TRANSLATED_GLOSS_LANGS[args.gloss_lang]:
-                    raise ValueError("Unsupported lemma language")
-    elif len(args.lemma_lang_codes) == 0:
-        args.lemma_lang_codes = KAIKKI_GLOSS_LANGS[args.gloss_lang]
-    else:
-        for lemma_lang in args.lemma_lang_codes:
-            if lemma_lang not in KAIKKI_GLOSS_LANGS[args.gloss_lang]:
-                raise ValueError("Unsupported lemma language")
+    args.lemma_langs = get_lemma_langs(args.gloss_langs, args.lemma_lang_codes)
+
+    if args.trace is not None:
+        # set before creating process pools
+        start_trace()
+    try:
+        with trace_span("build", " ".join(args.gloss_langs)):
+            build_files(args)
+    finally:
+        if args.trace is not None:
+            finish_trace(args.trace)
+            logger.info(f"Trace file saved to {args.trace}")
+
+
+def build_files(args: argparse.Namespace) -> None:
+    build_start = time.time_ns()
+    force_stages = STAGES if args.force == [] else frozenset(args.force or ())
+    x_ray_editions = args.x_ray_editions
+    if x_ray_editions is None:
+        x_ray_editions = [
+            gloss_lang
+            for gloss_lang in args.gloss_langs
+            if gloss_lang in X_RAY_EDITIONS
+        ]
+    x_ray_executor = None
+    x_ray_futures = []
+    if len(x_ray_editions) > 0:
+        # X-ray files are created in another pool alongside the Wiktionary files
+        x_ray_executor = ProcessPoolExecutor(
+            max_workers=get_x_ray_workers(
+                len(x_ray_editions), args.x_ray_workers, args.x_ray_memory_limit
+            ),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_x_ray_worker,
+            initargs=(args.x_ray_memory_limit,),
+        )
+        x_ray_futures = [
+            x_ray_executor.submit(
+                create_x_ray_file,
+                edition,
+                force_stages,
+                args.stream_wiki_dumps,
+                args.build_wiki_in_memory,
+                args.wiki_page_workers,
+            )
+            for edition in x_ray_editions
+        ]
+
+    try:
+        if not args.x_ray_only:
+            create_language_files(args.lemma_langs, force_stages)
+
+        if x_ray_executor is not None:
+            logger.info("Creating X-ray files")
+            for future in x_ray_futures:
+                future.result()
+            logger.info("X-ray files created")
+    finally:
+        if x_ray_executor is not None:
+            # don't wait for queued X-ray jobs if an error is raised
+            x_ray_executor.shutdown(cancel_futures=True)
+
+    for stage, stage_report in build_report(build_start).items():
+        for status, names in stage_report.items():
+            if len(names) > 0:
+                logger.info(f"{stage} steps {status}: {', '.join(names)}")
 
+
+def get_lemma_langs(
+    gloss_langs: list[str], lemma_lang_codes: list[str]
+) -> dict[str, list[str]]:
+    """
+    Return lemma languages of each gloss language, use all supported languages if
+    `lemma_lang_codes` is empty.
+    """
+    lemma_langs = {}
+    for gloss_lang in gloss_langs:
+        supported_langs = (
+            KAIKKI_TRANSLATED_GLOSS_LANGS[gloss_lang]
+            if gloss_lang in KAIKKI_TRANSLATED_GLOSS_LANGS
+            else KAIKKI_GLOSS_LANGS[gloss_lang]
+        )
+        lemma_langs[gloss_lang] = (
+            sorted(supported_langs)
+            if len(lemma_lang_codes) == 0
+            else [lang for lang in lemma_lang_codes if lang in supported_langs]
+        )
+    for lemma_lang in lemma_lang_codes:
+        if all(lemma_lang not in langs for langs in lemma_langs.values()):
+            raise ValueError("Unsupported lemma language")
+    return lemma_langs
+
+
+def wiktionary_task_size(lemma_lang: str, gloss_lang: str) -> float:
+    "Size of the task's JSONL file."
+    json_path = kaikki_json_path(lemma_lang, gloss_lang)
+    return json_path.stat().st_size if json_path.exists() else 0
+
+
+def create_language_files(
+    lemma_langs: dict[str, list[str]], force_stages: Collection[str] = ()
+) -> None:
+    """
+    Create files of all gloss languages in one process pool. Tasks of all
+    languages are submitted from the largest to the smallest JSONL file, KLLD
+    tasks are submitted once their Wiktionary files are created. Translated gloss
+    languages of a lemma language are created from one read of the JSONL file.
+    """
+    all_lemma_langs = sorted(set().union(*lemma_langs.values()))
+    # workers load the compiled files instead of parsing JSON files
+    for lemma_lang in all_lemma_langs:
+        compile_difficulty(lemma_lang)
     with ProcessPoolExecutor(
-        mp_context=multiprocessing.get_context("spawn")
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(list(lemma_langs), all_lemma_langs),
     ) as executor:
+        logger.info("Splitting Kaikki files")
+        # translated gloss languages are split from their edition's file, the
+        # translated file is only written if they are requested
+        editions: dict[str, set[str]] = {}
+        for gloss_lang, langs in lemma_langs.items():
+            for lemma_lang in langs:
+                if gloss_lang in KAIKKI_GLOSS_LANGS:
+                    editions.setdefault(gloss_lang, set())
+                else:
+                    edition = kaikki_dump_edition(lemma_lang, gloss_lang)
+                    editions.setdefault(edition, set()).add(lemma_lang)
+        for _ in executor.map(
+            partial(download_kaikki_json, force_stages=force_stages),
+            editions.keys(),
+            editions.values(),
+        ):
+            pass
+
         logger.info("Creating Wiktionary files")
+        # translated gloss languages that use the same JSONL file are one task
+        tasks: dict[Path, tuple[str, list[str]]] = {}
+        for gloss_lang, langs in lemma_langs.items():
+            for lemma_lang in langs:
+                task = tasks.setdefault(
+                    kaikki_json_path(lemma_lang, gloss_lang), (lemma_lang, [])
+                )
+                task[1].append(gloss_lang)
+        wiktionary_futures: dict[Future[list[Path]], tuple[str, list[str]]] = {}
+        for lemma_lang, gloss_langs in sorted(
+            tasks.values(),
+            key=lambda task: wiktionary_task_size(task[0], task[1][0]),
+            reverse=True,
+        ):
+            if gloss_langs[0] in KAIKKI_TRANSLATED_GLOSS_LANGS:
+                future = executor.submit(
+                    create_translated_wiktionary_files,
+                    lemma_lang,
+                    gloss_langs,
+                    force_stages,
+                )
+            else:
+                future = executor.submit(
+                    create_wiktionary_files_from_kaikki,
+                    lemma_lang,
+                    gloss_langs[0],
+                    force_stages,
+                )
+            wiktionary_futures[future] = (lemma_lang, gloss_langs)
         file_paths = []
-        if args.gloss_lang in KAIKKI_GLOSS_LANGS | KAIKKI_TRANSLATED_GLOSS_LANGS.keys():
-            if args.gloss_lang in KAIKKI_GLOSS_LANGS:
-                download_kaikki_json("", args.gloss_lang)
-            for db_paths in executor.map(
-                partial(
-                    create_wiktionary_files_from_kaikki, gloss_lang=args.gloss_lang
-                ),
-                args.lemma_lang_codes,
-            ):
-                file_paths.extend(db_paths)
+        klld_futures: list[Future[Path]] = []
+        for future in as_completed(wiktionary_futures):
+            lemma_lang, gloss_langs = wiktionary_futures[future]
+            file_paths.extend(future.result())
+            for gloss_lang in gloss_langs:
+                for klld_gloss_lang in (
+                    [gloss_lang, "zh_cn"] if gloss_lang == "zh" else [gloss_lang]
+                ):
+                    klld_futures.append(
+                        executor.submit(
+                            create_klld_file, klld_gloss_lang, lemma_lang, force_stages
+                        )
+                    )
         logger.info("Wiktionary files created")
 
         logger.info("Creating Kindle files")
-        kindle_db_path = Path()
-        if "en" in args.lemma_lang_codes and args.gloss_lang in ["en", "zh"]:
-            kindle_db_path = Path(f"build/en/kindle_en_en_v{MAJOR_VERSION}.db")
-            create_kindle_lemmas_db(kindle_db_path)
-
-        no_zh_cn_paths = file_paths.copy()
-        for db_path in executor.map(
-            partial(create_klld_db, args.gloss_lang),
-            args.lemma_lang_codes,
-        ):
-            no_zh_cn_paths.append(db_path)
-        archive_files(no_zh_cn_paths, kindle_db_path)
-        if args.gloss_lang == "zh":
-            for db_path in executor.map(
-                partial(create_klld_db, "zh_cn"),
-                args.lemma_lang_codes,
-            ):
-                file_paths.append(db_path)
-            archive_files(file_paths, kindle_db_path, True)
+        # the English Kindle database is shared by the en and zh archives
+        kindle_paths = []
+        if any("en" in lemma_langs.get(gloss_lang, []) for gloss_lang in ("en", "zh")):
+            kindle_paths = run_step(
+                BuildStep(
+                    "kindle",
+                    "en",
+                    [
+                        Path(str(files("proficiency") / "en" / name))
+                        for name in (
+                            "kindle_all_lemmas.csv",
+                            "kindle_enabled_lemmas.json",
+                            "kindle_lemma_forms.json",
+                        )
+                    ],
+                ),
+                partial(create_kindle_files, executor),
+                force_stages,
+            )
+
+        # archive_files() groups files by their names, sort paths to keep tar
+        # members in the same order
+        file_paths = sorted(file_paths) + sorted(
+            future.result() for future in klld_futures
+        )
+        archive_files(file_paths, kindle_paths, False, force_stages)
+        if "zh" in lemma_langs:
+            archive_files(file_paths, kindle_paths, True, force_stages)
         logger.info("Kindle files created")
 
-    if args.gloss_lang in X_RAY_EDITIONS:
-        create_wiki_db(args.gloss_lang)
+
+def create_kindle_files(executor: Executor) -> list[Path]:
+    kindle_db_path = Path(f"build/en/kindle_en_en_v{MAJOR_VERSION}.db")
+    create_kindle_lemmas_db(kindle_db_path, executor)
+    return [kindle_db_path, *create_lookup_files(kindle_db_path, "en")]
+
+
+def get_x_ray_workers(
+    editions_num: int, max_workers: int | None, memory_limit: int | None
+) -> int:
+    workers = min(editions_num, max_workers or os.process_cpu_count() or 1)
+    if memory_limit is not None and hasattr(os, "sysconf"):
+        total_memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        workers = min(workers, max(total_memory // (memory_limit * 1024 * 1024), 1))
+    return workers
 
 
 def archive_files(
-    file_paths: list[Path], kindle_db_path: Path, is_zh_cn: bool = False
+    file_paths: list[Path],
+    kindle_paths: list[Path],
+    is_zh_cn: bool = False,
+    force_stages: Collection[str] = (),
 ) -> None:
     grouped_paths = defaultdict(list)
     lemma_code = ""
@@ -119,11 +352,30 @@ def archive_files(
         if is_zh_cn:
             tar_name += "_cn"
         grouped_paths[tar_name].append(path)
-    for tar_name, paths in grouped_paths.items():
-        tar_path = Path(f"build/{tar_name}.tar.bz2")
-        tar_path.unlink(missing_ok=True)
-        with tarfile.open(name=tar_path, mode="x:bz2") as tar_f:
-            for path in paths:
-                tar_f.add(path, path.name)
+    # archives are compressed in threads
+    with ThreadPoolExecutor() as executor:
+        futures = []
+        for tar_name, paths in grouped_paths.items():
             if tar_name.startswith(("en_en", "en_zh")):
-                tar_f.add(kindle_db_path, kindle_db_path.name)
+                paths.extend(kindle_paths)
+            futures.append(
+                executor.submit(
+                    run_step,
+                    BuildStep(
+                        "archive",
+                        tar_name,
+                        paths,
+                        {"source_date_epoch": source_date_epoch()},
+                    ),
+                    partial(create_tar_file, tar_name, paths),
+                    force_stages,
+                )
+            )
+        for future in futures:
+            future.result()
+
+
+def create_tar_file(tar_name: str, paths: list[Path]) -> list[Path]:
+    tar_path = Path(f"build/{tar_name}.tar.bz2")
+    create_tar_bz2(tar_path, paths, source_date_epoch())
+    return [tar_path]
@@ -0,0 +1,143 @@
+import json
+import sqlite3
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+# languages written without spaces between words are matched by character
+CHARACTER_LANGS = frozenset({"ja", "th", "zh"})
+# trie nodes are dicts keyed by token, form group ids are stored under this key
+TERMINAL_KEY = ""
+TEXT_PUNCTUATION = '.,;:!?"“”()[]'
+
+
+def automaton_path(db_path: Path) -> Path:
+    return db_path.with_suffix(".trie.json")
+
+
+def split_form(form: str, by_character: bool) -> list[str]:
+    form = form.lower()
+    return [c for c in form if not c.isspace()] if by_character else form.split()
+
+
+def query_forms(conn: sqlite3.Connection) -> Iterator[tuple[str, int]]:
+    # lemmas are not always in the forms table, lemmas without forms have an
+    # empty form group
+    yield from conn.execute("""
+        SELECT form, form_group_id FROM forms
+        UNION
+        SELECT lemma, form_group_id FROM senses WHERE form_group_id IS NOT NULL
+        ORDER BY 1, 2
+        """)
+
+
+def build_trie(forms: Iterable[tuple[str, int]], by_character: bool) -> dict[str, Any]:
+    root: dict[str, Any] = {}
+    for form, form_group_id in forms:
+        tokens = split_form(form, by_character)
+        if len(tokens) == 0:
+            continue
+        node = root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        form_group_ids = node.setdefault(TERMINAL_KEY, [])
+        if form_group_id not in form_group_ids:
+            form_group_ids.append(form_group_id)
+    return root
+
+
+def build_automaton(db_path: Path, lemma_lang: str) -> Path:
+    """
+    Save a token trie of all forms and lemmas next to the database, the trie maps
+    each (multi-word) form to its form group ids. WordDumb loads this file instead
+    of building the matcher from the `forms` table.
+    """
+    by_character = lemma_lang in CHARACTER_LANGS
+    conn = sqlite3.connect(db_path)
+    trie = build_trie(query_forms(conn), by_character)
+    conn.close()
+
+    trie_path = automaton_path(db_path)
+    with trie_path.open("w", encoding="utf-8") as f:
+        json.dump(
+            {"by_character": by_character, "trie": trie},
+            f,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+    return trie_path
+
+
+class PhraseMatcher:
+    def __init__(self, trie: dict[str, Any], by_character: bool) -> None:
+        self.trie = trie
+        self.by_character = by_character
+
+    @classmethod
+    def load(cls, trie_path: Path) -> "PhraseMatcher":
+        with trie_path.open(encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["trie"], data["by_character"])
+
+    @classmethod
+    def from_db(cls, db_path: Path, lemma_lang: str) -> "PhraseMatcher":
+        "Save the trie file of the database then load it."
+        return cls.load(build_automaton(db_path, lemma_lang))
+
+    def tokenize(self, text: str) -> list[str]:
+        return [
+            stripped_token
+            for token in split_form(text, self.by_character)
+            if (stripped_token := token.strip(TEXT_PUNCTUATION)) != ""
+        ]
+
+    def match(self, tokens: list[str]) -> Iterator[tuple[int, int, list[int]]]:
+        """
+        Yield non-overlapping `(start, end, form_group_ids)` of the longest form
+        starting at each token position, tokens should be in lower case.
+        """
+        start = 0
+        tokens_len = len(tokens)
+        while start < tokens_len:
+            node = self.trie
+            end = start
+            last_match: tuple[int, list[int]] | None = None
+            while end < tokens_len:
+                next_node = node.get(tokens[end])
+                if next_node is None:
+                    break
+                node = next_node
+                end += 1
+                if TERMINAL_KEY in node:
+                    last_match = (end, node[TERMINAL_KEY])
+            if last_match is None:
+                start += 1
+            else:
+                yield start, last_match[0], last_match[1]
+                start = last_match[0]
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    db_path = Path(sys.argv[1])
+    lemma_lang = sys.argv[2]
+    text_path = Path(sys.argv[3])
+
+    start_time = time.perf_counter()
+    trie_path = build_automaton(db_path, lemma_lang)
+    print(f"build from database: {time.perf_counter() - start_time:.3f}s")
+
+    start_time = time.perf_counter()
+    matcher = PhraseMatcher.load(trie_path)
+    print(f"load prebuilt trie: {time.perf_counter() - start_time:.3f}s")
+
+    tokens = matcher.tokenize(text_path.read_text(encoding="utf-8"))
+    start_time = time.perf_counter()
+    match_count = sum(1 for _ in matcher.match(tokens))
+    elapsed = time.perf_counter() - start_time
+    print(
+        f"matched {match_count} forms in {len(tokens)} tokens: {elapsed:.3f}s, "
+        f"{len(tokens) / elapsed:.0f} tokens/s"
+    )
@@ -0,0 +1,240 @@
+import mmap
+import sqlite3
+import struct
+import sys
+from array import array
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+# magic, format version, key count, value count
+HEADER = struct.Struct("<4sIII")
+MAGIC = b"PSST"
+FORMAT_VERSION = 1
+
+
+def write_sorted_table(path: Path, items: Iterable[tuple[str, list[int]]]) -> None:
+    """
+    Write an immutable string to unsigned 32-bit integers map. The file has a
+    header, key offsets, value offsets, values and the UTF-8 key blob, all integers
+    are little-endian and keys are sorted by their UTF-8 bytes.
+    """
+    encoded_items = sorted((key.encode("utf-8"), values) for key, values in items)
+    key_offsets = array("I", [0])
+    value_offsets = array("I", [0])
+    values = array("I")
+    key_blob = bytearray()
+    for key, key_values in encoded_items:
+        key_blob += key
+        key_offsets.append(len(key_blob))
+        values.extend(key_values)
+        value_offsets.append(len(values))
+
+    if sys.byteorder == "big":
+        for int_array in (key_offsets, value_offsets, values):
+            int_array.byteswap()
+    with path.open("wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(encoded_items), len(values)))
+        f.write(key_offsets.tobytes())
+        f.write(value_offsets.tobytes())
+        f.write(values.tobytes())
+        f.write(key_blob)
+
+
+def load_uint32_array(view: memoryview) -> memoryview | array:
+    if sys.byteorder == "little":
+        return view.cast("I")
+    int_array = array("I", view)
+    int_array.byteswap()
+    return int_array
+
+
+def load_table_arrays(
+    view: memoryview, path: Path
+) -> tuple[int, memoryview | array, memoryview | array, memoryview | array, int]:
+    """
+    Return key count, key offsets, value offsets, values and the start of the key
+    blob of the sorted table file data.
+    """
+    magic, version, count, values_count = HEADER.unpack_from(view)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a sorted table file")
+    start = HEADER.size
+    key_offsets = load_uint32_array(view[start : start + 4 * (count + 1)])
+    start += 4 * (count + 1)
+    value_offsets = load_uint32_array(view[start : start + 4 * (count + 1)])
+    start += 4 * (count + 1)
+    values = load_uint32_array(view[start : start + 4 * values_count])
+    return count, key_offsets, value_offsets, values, start + 4 * values_count
+
+
+def read_sorted_table(path: Path) -> tuple[list[str], list[int], list[int]]:
+    """
+    Read keys, value offsets and values of the whole file without mmap, used by
+    small tables that are loaded to dicts.
+    """
+    data = path.read_bytes()
+    _, key_offsets, value_offsets, values, key_blob_start = load_table_arrays(
+        memoryview(data), path
+    )
+    key_offset_list = key_offsets.tolist()
+    keys = [
+        data[key_blob_start + start : key_blob_start + end].decode("utf-8")
+        for start, end in zip(key_offset_list, key_offset_list[1:])
+    ]
+    return keys, value_offsets.tolist(), values.tolist()
+
+
+class SortedTable:
+    """
+    Read a file created by `write_sorted_table()` with mmap, nothing is parsed
+    when the file is opened and keys are found with binary search.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.file = path.open("rb")
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mmap)
+        try:
+            (
+                self.count,
+                self.key_offsets,
+                self.value_offsets,
+                self.values,
+                self.key_blob_start,
+            ) = load_table_arrays(self.view, path)
+        except ValueError:
+            self.close()
+            raise
+
+    def key_at(self, index: int) -> bytes:
+        start = self.key_blob_start
+        return self.mmap[
+            start + self.key_offsets[index] : start + self.key_offsets[index + 1]
+        ]
+
+    def find(self, key: str) -> int:
+        encoded_key = key.encode("utf-8")
+        low = 0
+        high = self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key_at(middle) < encoded_key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self.key_at(low) == encoded_key:
+            return low
+        return -1
+
+    def get(self, key: str) -> memoryview | array | None:
+        index = self.find(key)
+        if index == -1:
+            return None
+        return self.values[self.value_offsets[index] : self.value_offsets[index + 1]]
+
+    def __getitem__(self, key: str) -> memoryview | array:
+        values = self.get(key)
+        if values is None:
+            raise KeyError(key)
+        return values
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.find(key) != -1
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self.count):
+            yield self.key_at(index).decode("utf-8")
+
+    def close(self) -> None:
+        for attr in ("key_offsets", "value_offsets", "values", "view"):
+            view = getattr(self, attr, None)
+            if isinstance(view, memoryview):
+                view.release()
+        self.mmap.close()
+        self.file.close()
+
+    def __enter__(self) -> "SortedTable":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+def form_table_path(db_path: Path) -> Path:
+    return db_path.with_suffix(".forms.sst")
+
+
+def sense_id_ranges(sense_ids: Iterable[int]) -> list[int]:
+    # consecutive sense ids are merged to flattened [start, end) pairs
+    ranges: list[int] = []
+    for sense_id in sorted(sense_ids):
+        if len(ranges) > 0 and ranges[-1] == sense_id:
+            ranges[-1] = sense_id + 1
+        else:
+            ranges.extend((sense_id, sense_id + 1))
+    return ranges
+
+
+def build_form_table(db_path: Path) -> Path:
+    conn = sqlite3.connect(db_path)
+    sense_ids: defaultdict[str, set[int]] = defaultdict(set)
+    for form, sense_id in conn.execute("""
+        SELECT form, senses.id FROM forms JOIN senses USING (form_group_id)
+        UNION ALL
+        SELECT lemma, id FROM senses
+        """):
+        sense_ids[form.casefold()].add(sense_id)
+    conn.close()
+
+    table_path = form_table_path(db_path)
+    write_sorted_table(
+        table_path,
+        ((form, sense_id_ranges(ids)) for form, ids in sense_ids.items()),
+    )
+    return table_path
+
+
+class FormTable(SortedTable):
+    def lookup(self, form: str) -> list[range]:
+        values = self.get(form.casefold())
+        if values is None:
+            return []
+        return [range(values[i], values[i + 1]) for i in range(0, len(values), 2)]
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    db_path = Path(sys.argv[1])
+    table_path = build_form_table(db_path)
+
+    start_time = time.perf_counter()
+    table = FormTable(table_path)
+    print(f"open table: {(time.perf_counter() - start_time) * 1000:.3f}ms")
+
+    conn = sqlite3.connect(db_path)
+    forms = [form for (form,) in conn.execute("SELECT form FROM forms")]
+    samples = random.choices(forms, k=100_000) if len(forms) > 0 else []
+
+    start_time = time.perf_counter()
+    for form in samples:
+        table.lookup(form)
+    print(f"table lookups: {time.perf_counter() - start_time:.3f}s")
+
+    start_time = time.perf_counter()
+    for form in samples:
+        conn.execute(
+            """
+            SELECT senses.id FROM forms JOIN senses USING (form_group_id)
+            WHERE form = ?
+            """,
+            (form,),
+        ).fetchall()
+    print(f"SQLite lookups: {time.perf_counter() - start_time:.3f}s")
+    conn.close()
+    table.close()
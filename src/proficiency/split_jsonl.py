@@ -1,50 +1,80 @@
 import json
+from collections.abc import Collection, Iterable, Iterator
 from gzip import GzipFile
 from pathlib import Path
 from typing import IO
 
+from .util import iter_in_thread
+
 
 def split_kaikki_jsonl(
-    jsonl_f: IO[bytes] | GzipFile, lemma_code: str, gloss_code: str
-) -> None:
+    jsonl_f: IO[bytes] | GzipFile,
+    edition: str,
+    translated_lemma_langs: Collection[str] = (),
+) -> list[Path]:
     """
     Split extracted jsonl file created by wiktextract to each language file.
+    Lines of `translated_lemma_langs` that have translations are also written to
+    the file of requested translated gloss languages.
     """
-    from .languages import KAIKKI_LEMMA_LANGS, KAIKKI_TRANSLATED_GLOSS_LANGS
-    from .main import logger
+    from .config import logger
+    from .extract_kaikki import kaikki_json_path, translated_json_path
+    from .languages import KAIKKI_LEMMA_LANGS
 
     logger.info("Start splitting JSONL file")
-    if gloss_code in KAIKKI_TRANSLATED_GLOSS_LANGS:
-        lemma_codes = {lemma_code}
-        gloss_code = lemma_code
-    else:
-        lemma_codes = KAIKKI_LEMMA_LANGS
-
     out_file_paths = {
-        l_code: Path(f"build/{l_code}/{l_code}_{gloss_code}.jsonl")
-        for l_code in lemma_codes
+        l_code: kaikki_json_path(l_code, edition) for l_code in KAIKKI_LEMMA_LANGS
+    }
+    translated_file_paths = {
+        l_code: translated_json_path(l_code, edition)
+        for l_code in translated_lemma_langs
     }
     for out_file_path in out_file_paths.values():
         out_file_path.parent.mkdir(parents=True, exist_ok=True)
     out_files = {
         l_code: out_file_path.open("w", encoding="utf-8")
-        for l_code, out_file_path in zip(lemma_codes, out_file_paths.values())
+        for l_code, out_file_path in out_file_paths.items()
+    }
+    translated_files = {
+        l_code: out_file_path.open("w", encoding="utf-8")
+        for l_code, out_file_path in translated_file_paths.items()
     }
 
-    for line in iter(jsonl_f.readline, b""):
-        data = json.loads(line)
-        if "lang_code" in data:
-            lang_code = data["lang_code"]
-            if lang_code in lemma_codes:
-                out_files[lang_code].write(line.decode("utf-8"))
-            else:
-                new_lang_code = convert_lang_code(lang_code)
-                if new_lang_code in lemma_codes:
-                    out_files[new_lang_code].write(line.decode("utf-8"))
+    # read the pipe, parse lines and write files in three threads
+    for lang_code, line, has_translations in iter_in_thread(
+        iter_lang_lines(iter_in_thread(iter(jsonl_f.readline, b"")), KAIKKI_LEMMA_LANGS)
+    ):
+        out_files[lang_code].write(line)
+        if has_translations and lang_code in translated_files:
+            translated_files[lang_code].write(line)
 
     for out_f in out_files.values():
         out_f.close()
+    for out_f in translated_files.values():
+        out_f.close()
     logger.info("Split JSONL file completed")
+    return list(out_file_paths.values()) + list(translated_file_paths.values())
+
+
+def iter_lang_lines(
+    lines: Iterable[bytes], lemma_codes: Collection[str]
+) -> Iterator[tuple[str, str, bool]]:
+    """
+    Yield lines of lemma languages, their language codes and whether they have
+    translations.
+    """
+    for line in lines:
+        data = json.loads(line)
+        if "lang_code" in data:
+            lang_code = data["lang_code"]
+            if lang_code not in lemma_codes:
+                lang_code = convert_lang_code(lang_code)
+            if lang_code in lemma_codes:
+                yield (
+                    lang_code,
+                    line.decode("utf-8"),
+                    len(data.get("translations", [])) > 0,
+                )
 
 
 def convert_lang_code(code: str) -> str:
@@ -0,0 +1,135 @@
+import json
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+# Folder of the per-process event files, worker processes inherit the variable
+# from the main process.
+TRACE_DIR_ENV = "PROFICIENCY_TRACE_DIR"
+
+
+def start_trace() -> Path:
+    """
+    Enable tracing in this process and in processes started after calling this
+    function.
+    """
+    import tempfile
+
+    trace_dir = Path(tempfile.mkdtemp(prefix="proficiency_trace_"))
+    os.environ[TRACE_DIR_ENV] = str(trace_dir)
+    return trace_dir
+
+
+def finish_trace(out_path: Path) -> None:
+    """
+    Merge events of all processes to a Chrome trace event file, the file could be
+    opened in https://ui.perfetto.dev or chrome://tracing
+    """
+    import shutil
+
+    trace_dir = Path(os.environ.pop(TRACE_DIR_ENV))
+    events: list[dict] = []
+    for events_path in trace_dir.glob("*.jsonl"):
+        with events_path.open(encoding="utf-8") as f:
+            events.extend(json.loads(line) for line in f)
+    events.sort(key=lambda event: event["ts"])
+    process_events = [
+        {
+            "name": "process_name",
+            "ph": "M",
+            "pid": pid,
+            "args": {"name": "main" if pid == os.getpid() else f"worker {pid}"},
+        }
+        for pid in sorted({event["pid"] for event in events})
+    ]
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", encoding="utf-8") as f:
+        json.dump({"traceEvents": process_events + events}, f)
+    shutil.rmtree(trace_dir)
+
+
+def resource_usage() -> dict[str, int]:
+    """
+    Return CPU time, peak RSS and I/O bytes of this process. Values are of the
+    whole process, spans of different threads in a process are not separated.
+    The peak RSS is the largest RSS since the process started in KiB, it's not
+    the peak of a span.
+    """
+    import sys
+
+    usage = {"cpu_ns": time.process_time_ns()}
+    try:
+        import resource
+    except ImportError:  # Windows
+        pass
+    else:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        usage["child_cpu_ns"] = int((children.ru_utime + children.ru_stime) * 1e9)
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # bytes on macOS, KiB on Linux
+        usage["process_peak_rss_kib"] = (
+            peak_rss // 1024 if sys.platform == "darwin" else peak_rss
+        )
+    # Linux only, bytes of read and write system calls
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            for line in f:
+                key, value = line.split(":")
+                if key in ("rchar", "wchar"):
+                    usage[key] = int(value)
+    except OSError:
+        pass
+    return usage
+
+
+@contextmanager
+def trace_span(category: str, name: str) -> Iterator[dict[str, object]]:
+    """
+    Record a complete event of the code in the `with` block if tracing is enabled,
+    values added to the yielded dictionary are saved in the event's "args".
+    """
+    import threading
+
+    args: dict[str, object] = {}
+    trace_dir = os.environ.get(TRACE_DIR_ENV)
+    if trace_dir is None:
+        yield args
+        return
+
+    start_ts = time.time_ns()
+    start_counter = time.perf_counter_ns()
+    start_usage = resource_usage()
+    try:
+        yield args
+    finally:
+        end_counter = time.perf_counter_ns()
+        end_usage = resource_usage()
+        args["cpu_ms"] = (end_usage["cpu_ns"] - start_usage["cpu_ns"]) / 1e6
+        if "child_cpu_ns" in end_usage:
+            args["child_cpu_ms"] = (
+                end_usage["child_cpu_ns"] - start_usage["child_cpu_ns"]
+            ) / 1e6
+            # lifetime peak of the process when the span ends, could be reached
+            # before the span started
+            args["process_peak_rss_kib"] = end_usage["process_peak_rss_kib"]
+        for key, arg_name in (("rchar", "read_bytes"), ("wchar", "written_bytes")):
+            if key in end_usage:
+                args[arg_name] = end_usage[key] - start_usage[key]
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_ts / 1000,  # microseconds
+            "dur": (end_counter - start_counter) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_native_id(),
+            "args": args,
+        }
+        # one write call for each line, threads of the process append to the
+        # same file
+        with (Path(trace_dir) / f"{os.getpid()}.jsonl").open(
+            "a", encoding="utf-8"
+        ) as f:
+            f.write(json.dumps(event) + "\n")
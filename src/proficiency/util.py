@@ -1,7 +1,12 @@
 import json
 import math
 import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, Future
+from functools import cache
 from importlib.resources import files
+from importlib.resources.abc import Traversable
 from itertools import chain
 
 
@@ -53,24 +58,32 @@ def get_short_def(gloss: str, gloss_lang: str) -> str:
     return remove_full_stop(gloss)
 
 
+def difficulty_data_path(lemma_lang: str) -> Traversable:
+    if lemma_lang == "en":
+        return files("proficiency") / "en" / "kindle_enabled_lemmas.json"
+    return files("proficiency") / lemma_lang / "difficulty.json"
+
+
 def load_difficulty_data(lemma_lang: str) -> dict[str, int]:
     difficulty_data = {}
+    difficulty_json_path = difficulty_data_path(lemma_lang)
     if lemma_lang == "en":
-        with (files("proficiency") / "en" / "kindle_enabled_lemmas.json").open(
-            encoding="utf-8"
-        ) as f:
+        with difficulty_json_path.open(encoding="utf-8") as f:
             difficulty_data = {
                 lemma: values[0] for lemma, values in json.load(f).items()
             }
-    else:
-        difficulty_json_path = files("proficiency") / lemma_lang / "difficulty.json"
-        if difficulty_json_path.is_file():
-            with difficulty_json_path.open(encoding="utf-8") as f:
-                difficulty_data = json.load(f)
+    elif difficulty_json_path.is_file():
+        with difficulty_json_path.open(encoding="utf-8") as f:
+            difficulty_data = json.load(f)
 
     return difficulty_data
 
 
+# change it when `freq_to_difficulty()` returns different values, cached values
+# are keyed by it
+FREQ_DIFFICULTY_VERSION = 1
+
+
 def freq_to_difficulty(word: str, lang: str) -> tuple[bool, int]:
     """
     Zipf values are between 0 and 8, `zipf_frequency()` returns 0 if word is not in the
@@ -100,15 +113,86 @@ def freq_to_difficulty(word: str, lang: str) -> tuple[bool, int]:
     return False, freq
 
 
-def get_en_inflections(lemma: str, pos: str | None) -> set[str]:
+@cache
+def get_t2s_converter():
+    import opencc
+
+    return opencc.OpenCC("t2s.json")
+
+
+@cache
+def get_en_inflections(lemma: str, pos: str | None) -> frozenset[str]:
     from lemminflect import getAllInflections, getAllInflectionsOOV
 
-    inflections = set(chain(*getAllInflections(lemma, pos).values()))
+    inflections = frozenset(chain(*getAllInflections(lemma, pos).values()))
     if not inflections and pos:
-        inflections = set(chain(*getAllInflectionsOOV(lemma, pos).values()))
+        inflections = frozenset(chain(*getAllInflectionsOOV(lemma, pos).values()))
     return inflections
 
 
+def map_in_order[T, R](
+    executor: Executor, fn: Callable[[T], R], iterable: Iterable[T], buffersize: int
+) -> Iterator[R]:
+    """
+    Like `executor.map()` but only `buffersize` tasks are submitted at the same
+    time, the iterable is not consumed ahead of the results.
+    """
+    futures: deque[Future[R]] = deque()
+    for item in iterable:
+        futures.append(executor.submit(fn, item))
+        if len(futures) >= buffersize:
+            yield futures.popleft().result()
+    while len(futures) > 0:
+        yield futures.popleft().result()
+
+
+def iter_in_thread[T](
+    iterable: Iterable[T], chunk_size: int = 256, max_chunks: int = 16
+) -> Iterator[T]:
+    """
+    Consume `iterable` in a thread and yield its items, the thread waits if
+    `max_chunks` chunks of items are not used. Reading files and SQLite queries
+    release the GIL, stages connected by this function run at the same time.
+    """
+    import queue
+    import threading
+
+    chunks: queue.Queue[list[T] | BaseException | None] = queue.Queue(max_chunks)
+    stopped = threading.Event()
+
+    def produce() -> None:
+        try:
+            chunk = []
+            for item in iterable:
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    chunks.put(chunk)
+                    if stopped.is_set():
+                        return
+                    chunk = []
+            chunks.put(chunk)
+            chunks.put(None)
+        except BaseException as e:
+            chunks.put(e)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while (chunk := chunks.get()) is not None:
+            if isinstance(chunk, BaseException):
+                raise chunk
+            yield from chunk
+    finally:
+        # unblock the thread if the consumer stops early
+        stopped.set()
+        while thread.is_alive():
+            try:
+                chunks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        thread.join()
+
+
 if __name__ == "__main__":
     import sqlite3
     import sys
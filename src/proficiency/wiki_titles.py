@@ -1,5 +1,11 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from gzip import GzipFile
 from pathlib import Path
 from sqlite3 import Connection
+from typing import IO
+
+from .sql_dump import SQLValue, iter_line_blocks, iter_sql_rows
 
 X_RAY_EDITIONS = {
     "ca",
@@ -28,180 +34,329 @@ X_RAY_EDITIONS = {
 }
 
 
-def download_title_sql_dump(url: str) -> Path:
-    import gzip
-    import shutil
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+# dump files parsed in this order
+TITLE_SQL_DUMP_SUFFIXES = ("-page.sql.gz", "-page_props.sql.gz", "-redirect.sql.gz")
+
 
+def dump_request_headers() -> dict[str, str]:
+    from .config import VERSION
+
+    return {
+        "user-agent": f"Proficiency/{VERSION} (https://github.com/xxyzz/Proficiency)"
+    }
+
+
+def request_title_sql_dump(url: str):
     import requests
 
-    from .main import VERSION, logger
+    r = requests.get(url, headers=dump_request_headers(), stream=True)
+    r.raise_for_status()
+    return r
+
+
+def title_sql_dump_url(edition: str, file_suffix: str) -> str:
+    return (
+        f"https://dumps.wikimedia.org/{edition}wiki/latest/"
+        f"{edition}wiki-latest{file_suffix}"
+    )
+
+
+def title_sql_dump_versions(edition: str) -> dict[str, str]:
+    """
+    Return the "Last-Modified" and "ETag" headers of the edition's "latest" dump
+    files, they are changed when a new dump is published.
+    """
+    import requests
+
+    versions = {}
+    for file_suffix in TITLE_SQL_DUMP_SUFFIXES:
+        r = requests.head(
+            title_sql_dump_url(edition, file_suffix),
+            headers=dump_request_headers(),
+            allow_redirects=True,
+        )
+        r.raise_for_status()
+        versions[file_suffix] = (
+            f"{r.headers.get('last-modified', '')} {r.headers.get('etag', '')}"
+        )
+    return versions
+
+
+def download_title_sql_dump(url: str) -> Path:
+    from .config import logger
+    from .trace import trace_span
 
     filename = url.rsplit("/", maxsplit=1)[-1]
     sql_gz_path = Path("build") / filename
-    sql_path = sql_gz_path.with_name(sql_gz_path.stem)
-    if not sql_path.exists() and not sql_gz_path.exists():
+    if not sql_gz_path.exists():
         logger.info(f"Downloading {filename}")
-        r = requests.get(
-            url,
-            headers={
-                "user-agent": f"Proficiency/{VERSION} (https://github.com/xxyzz/Proficiency)"
-            },
-            stream=True,
-        )
-        with sql_gz_path.open("wb") as f:
-            for chunk in r.iter_content(chunk_size=8192):
+        sql_gz_path.parent.mkdir(exist_ok=True)
+        part_path = sql_gz_path.with_name(filename + ".part")
+        with (
+            trace_span("download", filename),
+            request_title_sql_dump(url) as r,
+            part_path.open("wb") as f,
+        ):
+            for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                 f.write(chunk)
+        part_path.rename(sql_gz_path)
         logger.info(f"{filename} downloaded")
-    if not sql_path.exists():
-        with gzip.open(sql_gz_path, "rb") as f_in, sql_path.open("wb") as f_out:
-            shutil.copyfileobj(f_in, f_out)
-        sql_gz_path.unlink()
-    return sql_path
+    return sql_gz_path
+
+
+@contextmanager
+def open_title_sql_dump(
+    url: str, stream: bool = False
+) -> Iterator[IO[bytes] | GzipFile]:
+    """
+    Yield the decompressed dump file, the gzip file is decompressed by pigz or
+    gzip if they are installed. If `stream` is `True`, the HTTP response is
+    decompressed while downloading and nothing is saved to disk.
+    """
+    import gzip
+    import subprocess
+    from shutil import which
+
+    if stream:
+        with request_title_sql_dump(url) as r:
+            r.raw.decode_content = False
+            with GzipFile(fileobj=r.raw, mode="rb") as f:
+                yield f
+        return
+
+    sql_gz_path = download_title_sql_dump(url)
+    if which("pigz") is None and which("gzip") is None:
+        with gzip.open(sql_gz_path, "rb") as f:
+            yield f
+    else:
+        command_args = ["pigz" if which("pigz") is not None else "gzip", "-d", "-c"]
+        command_args.append(str(sql_gz_path))
+        sub_p = subprocess.Popen(command_args, stdout=subprocess.PIPE)
+        if sub_p.stdout is not None:
+            with sub_p.stdout as f:
+                yield f
+        if sub_p.wait() != 0:
+            raise subprocess.CalledProcessError(sub_p.returncode, command_args)
+    sql_gz_path.unlink()
 
 
-def init_db(edition: str) -> tuple[Connection, Path]:
+PAGE_COLUMNS = """
+title TEXT PRIMARY KEY COLLATE NOCASE,
+description TEXT,
+wikidata_item TEXT,
+redirect_to TEXT,
+redirect_fragment TEXT
+"""
+
+
+def init_db(edition: str, in_memory: bool = False) -> tuple[Connection, Path]:
+    """
+    Create the "pages" table, the page ID is saved as the rowid. If `in_memory` is
+    `True`, the database is created in memory and written to disk by `save_db()`.
+    """
     import sqlite3
 
-    from .main import MAJOR_VERSION
+    from .config import MAJOR_VERSION
 
     db_path = Path(f"build/{edition}.wikipedia.org_v{MAJOR_VERSION}.db")
     if db_path.exists():
         db_path.unlink()
-    conn = sqlite3.connect(db_path)
-    conn.execute("""
-    CREATE TABLE pages (
-    title TEXT PRIMARY KEY COLLATE NOCASE,
-    description TEXT,
-    wikidata_item TEXT,
-    redirect_to TEXT,
-    redirect_fragment TEXT,
-    id INTEGER)
-    """)
+    conn = sqlite3.connect(":memory:" if in_memory else db_path)
+    conn.execute(f"CREATE TABLE pages ({PAGE_COLUMNS})")
     return conn, db_path
 
 
-def create_temp_index(conn: Connection):
-    conn.executescript("""
-    CREATE INDEX id_idx ON pages (id);
-    PRAGMA optimize;
-    """)
-    conn.commit()
+def save_db(conn: Connection, db_path: Path, in_memory: bool = False) -> None:
+    """
+    Rebuild the database without free pages of deleted rows. The in-memory
+    database is written to `db_path` by `VACUUM INTO` in one pass, the table and
+    the title index are copied in order without another copy in memory.
+    """
+    if in_memory:
+        conn.execute("VACUUM INTO ?", (str(db_path),))
+    else:
+        conn.execute("VACUUM")
+    conn.close()
 
 
-def drop_temp_index(conn: Connection):
-    conn.executescript("""
-    DROP INDEX id_idx;
-    ALTER TABLE pages DROP COLUMN id;
-    VACUUM;
-    """)
-    conn.commit()
-    conn.close()
+def get_pages(f: IO[bytes] | GzipFile) -> Iterator[tuple[str, SQLValue]]:
+    for page_id, namespace, title in iter_sql_rows(f, (0, 1, 2)):
+        if namespace == 0:
+            yield str(title).replace("_", " "), page_id
 
 
-def parse_sql_line(line: str):
-    import csv
-    import io
-    import re
+def parse_page_block(block: bytes) -> list[tuple[str, SQLValue]]:
+    from io import BytesIO
 
-    line = re.sub(r"^INSERT INTO `.+` VALUES \(", "", line)
-    line = line.strip("(); \n").replace("),(", "\n")
-    return csv.reader(
-        io.StringIO(line),
-        delimiter=",",
-        quotechar="'",
-        escapechar="\\",
-        doublequote=False,
-    )
+    return list(get_pages(BytesIO(block)))
 
 
-def parse_page_sql(conn: Connection, input_path: Path):
+def parse_page_sql(conn: Connection, f: IO[bytes] | GzipFile, workers: int = 1):
+    """
+    If `workers` is more than one, the decompressed dump stream is split to
+    blocks at line ends and parsed in a process pool, workers only send back
+    titles and ids of the main namespace.
+    """
     # https://www.mediawiki.org/wiki/Manual:Page_table
-    from .main import logger
-
-    with input_path.open("r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            if line.startswith("INSERT INTO "):
-                for row in parse_sql_line(line):
-                    page_id, namespace, title, *_ = row
-                    if namespace == "0":
-                        # MediaWiki titles could be case insensitive
-                        conn.execute(
-                            "INSERT OR IGNORE INTO pages (title, id) VALUES(?, ?)",
-                            (title.replace("_", " "), page_id),
-                        )
-    create_temp_index(conn)
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import chain
+
+    from .config import logger
+    from .util import map_in_order
+
+    # MediaWiki titles could be case insensitive
+    insert_sql = "INSERT OR IGNORE INTO pages (title, rowid) VALUES(?, ?)"
+    if workers <= 1:
+        conn.executemany(insert_sql, get_pages(f))
+    else:
+        with ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            # keep dump order, the first page of the same title is saved
+            batches = map_in_order(
+                executor, parse_page_block, iter_line_blocks(f), workers * 2
+            )
+            conn.executemany(insert_sql, chain.from_iterable(batches))
+    conn.commit()
     logger.info("page.sql done")
 
 
-def parse_page_props_sql(conn: Connection, input_path: Path):
+# page_props property names and their columns in the "pages" table
+PAGE_PROPS = {
+    "disambiguation": 0,
+    "wikibase-shortdesc": 1,
+    "wikibase_item": 2,
+}
+
+
+def get_page_props(f: IO[bytes] | GzipFile):
+    for page_id, propname, value in iter_sql_rows(f, (0, 1, 2)):
+        column = PAGE_PROPS.get(str(propname))
+        if column is not None:
+            row: list[SQLValue] = [page_id, None, None, None]
+            row[column + 1] = 1 if column == 0 else str(value)
+            yield row
+
+
+def parse_page_props_sql(conn: Connection, f: IO[bytes] | GzipFile):
     # https://www.mediawiki.org/wiki/Manual:Page_props_table
-    from .main import logger
-
-    # ignore "UnicodeDecodeError" in glob type column
-    with input_path.open("r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            if line.startswith("INSERT INTO "):
-                for row in parse_sql_line(line):
-                    page_id, propname, value, *_ = row
-                    if propname == "disambiguation":
-                        conn.execute("DELETE FROM pages WHERE id = ?", (page_id,))
+    from .config import logger
+
+    # pages are joined to temp tables by the rowid and the temp tables' integer
+    # primary key
+    conn.execute("""
+    CREATE TEMP TABLE page_props (
+    id INTEGER PRIMARY KEY,
+    disambiguation INTEGER,
+    description TEXT,
+    wikidata_item TEXT)
+    """)
+    # each property of a page is in a different row
+    conn.executemany(
+        """
+        INSERT INTO page_props VALUES(?, ?, ?, ?)
+        ON CONFLICT DO UPDATE SET
+        disambiguation = coalesce(excluded.disambiguation, disambiguation),
+        description = coalesce(excluded.description, description),
+        wikidata_item = coalesce(excluded.wikidata_item, wikidata_item)
+        """,
+        get_page_props(f),
+    )
+    conn.executescript("""
+    DELETE FROM pages WHERE rowid IN (
+      SELECT id FROM page_props WHERE disambiguation IS NOT NULL
+    );
+
+    UPDATE pages
+    SET description = page_props.description,
+    wikidata_item = page_props.wikidata_item
+    FROM page_props WHERE pages.rowid = +page_props.id;
+
+    DROP TABLE page_props;
+    """)
     conn.commit()
     logger.info("page_props.sql done")
 
 
-def parse_redirect_sql(conn: Connection, input_path: Path):
+def get_redirects(f: IO[bytes] | GzipFile):
+    for from_id, namespace, to_title, interwiki, fragment in iter_sql_rows(f):
+        if namespace == 0 and not interwiki:
+            yield (
+                from_id,
+                str(to_title).replace("_", " "),
+                str(fragment).replace(" ", "_") if fragment else None,
+            )
+
+
+def parse_redirect_sql(conn: Connection, f: IO[bytes] | GzipFile):
     # https://www.mediawiki.org/wiki/Manual:Redirect_table
-    from .main import logger
-
-    with input_path.open("r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            if line.startswith("INSERT INTO "):
-                for row in parse_sql_line(line):
-                    from_id, namespace, to_title, interwiki, fragment = row
-                    if namespace == "0" and interwiki == "":
-                        to_title = to_title.replace("_", " ")
-                        if fragment == "":
-                            fragment = None
-                        else:
-                            fragment = fragment.replace(" ", "_")
-                        has_target_page = False
-                        for _ in conn.execute(
-                            "SELECT * FROM pages WHERE title = ?", (to_title,)
-                        ):
-                            conn.execute(
-                                """
-                                UPDATE pages SET redirect_to = ?, redirect_fragment = ?
-                                WHERE id = ?
-                                """,
-                                (to_title, fragment, from_id),
-                            )
-                            has_target_page = True
-                        if not has_target_page:
-                            conn.execute("DELETE FROM pages WHERE id = ?", (from_id,))
-    drop_temp_index(conn)
+    from .config import logger
+
+    conn.execute("""
+    CREATE TEMP TABLE redirects (
+    id INTEGER PRIMARY KEY,
+    title TEXT COLLATE NOCASE,
+    fragment TEXT)
+    """)
+    conn.executemany(
+        "INSERT OR REPLACE INTO redirects VALUES(?, ?, ?)", get_redirects(f)
+    )
+    # remove redirect pages that don't have target page, then save the target
+    # title to the remaining redirect pages
+    conn.executescript("""
+    DELETE FROM pages WHERE rowid IN (
+      SELECT id FROM redirects
+      WHERE NOT EXISTS (SELECT 1 FROM pages WHERE pages.title = redirects.title)
+    );
+
+    UPDATE pages SET redirect_to = redirects.title, redirect_fragment = fragment
+    FROM redirects WHERE pages.rowid = +redirects.id;
+
+    DROP TABLE redirects;
+    """)
+    conn.commit()
     logger.info("redirect.sql done")
 
 
-def create_wiki_db(edition: str):
+def create_wiki_db(
+    edition: str, stream: bool = False, in_memory: bool = False, page_workers: int = 1
+) -> Path:
     import bz2
     import shutil
+    from concurrent.futures import ThreadPoolExecutor
+    from functools import partial
 
-    conn, db_path = init_db(edition)
-    for file in ("-page.sql.gz", "-page_props.sql.gz", "-redirect.sql.gz"):
-        input_path = download_title_sql_dump(
-            f"https://dumps.wikimedia.org/{edition}wiki/latest/{edition}wiki-latest{file}"
+    conn, db_path = init_db(edition, in_memory)
+    parse_functions: list[Callable[[Connection, IO[bytes] | GzipFile], None]] = [
+        partial(parse_page_sql, workers=page_workers),
+        parse_page_props_sql,
+        parse_redirect_sql,
+    ]
+    urls = [
+        title_sql_dump_url(edition, file_suffix)
+        for file_suffix in TITLE_SQL_DUMP_SUFFIXES
+    ]
+    with ThreadPoolExecutor(max_workers=len(urls)) as download_executor:
+        # download all dump files at the same time, parse them in order
+        downloads = (
+            [None] * len(urls)
+            if stream
+            else [
+                download_executor.submit(download_title_sql_dump, url) for url in urls
+            ]
         )
-        match file:
-            case "-page.sql.gz":
-                parse_page_sql(conn, input_path)
-            case "-page_props.sql.gz":
-                parse_page_props_sql(conn, input_path)
-            case "-redirect.sql.gz":
-                parse_redirect_sql(conn, input_path)
-        input_path.unlink()
+        for url, download, parse_function in zip(urls, downloads, parse_functions):
+            if download is not None:
+                download.result()
+            with open_title_sql_dump(url, stream) as f:
+                parse_function(conn, f)
+    save_db(conn, db_path, in_memory)
     bz2_path = db_path.with_name(db_path.name + ".bz2")
     if bz2_path.exists():
         bz2_path.unlink()
     with db_path.open("rb") as in_f, bz2.open(bz2_path, mode="wb") as out_f:
         shutil.copyfileobj(in_f, out_f)
     db_path.unlink()
+    return bz2_path
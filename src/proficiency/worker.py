@@ -0,0 +1,168 @@
+from collections.abc import Collection
+from functools import partial
+from importlib import import_module
+from pathlib import Path
+
+from .build_manifest import BuildStep, run_step
+from .config import configure_logging, source_date_epoch
+
+# Task functions of the process pools, workers import this module instead of
+# "main" when the tasks are unpickled.
+
+
+def init_worker(gloss_langs: Collection[str], lemma_langs: Collection[str]) -> None:
+    """
+    Load resources shared by all tasks once in each worker process. wordfreq's
+    frequency lists are loaded by its cache in the first task that needs them,
+    values in the difficulty cache don't need them.
+    """
+    from .util import get_t2s_converter
+
+    configure_logging()
+    import_module("wiktextract_lemmatization.utils")
+    if "zh" in gloss_langs or "zh" in lemma_langs:
+        get_t2s_converter()
+
+
+def init_x_ray_worker(memory_limit: int | None) -> None:
+    configure_logging()
+    if memory_limit is None:
+        return
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    limit = memory_limit * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def wiktionary_step(lemma_lang: str, gloss_lang: str) -> BuildStep:
+    from importlib.metadata import version
+
+    from .extract_kaikki import kaikki_json_path
+    from .util import FREQ_DIFFICULTY_VERSION, difficulty_data_path
+
+    inputs = [kaikki_json_path(lemma_lang, gloss_lang)]
+    params: dict[str, str | int] = {}
+    difficulty_path = difficulty_data_path(lemma_lang)
+    if difficulty_path.is_file():
+        inputs.append(Path(str(difficulty_path)))
+    else:
+        # difficulty is calculated from wordfreq or read from the cache
+        params = {
+            "wordfreq_version": version("wordfreq"),
+            "freq_difficulty_version": FREQ_DIFFICULTY_VERSION,
+        }
+    return BuildStep("wiktionary", f"{lemma_lang}_{gloss_lang}", inputs, params)
+
+
+def create_wiktionary_files_from_kaikki(
+    lemma_lang: str, gloss_lang: str = "en", force_stages: Collection[str] = ()
+) -> list[Path]:
+    from .extract_kaikki import create_lemmas_db_from_kaikki
+
+    return run_step(
+        wiktionary_step(lemma_lang, gloss_lang),
+        partial(create_lemmas_db_from_kaikki, lemma_lang, gloss_lang),
+        force_stages,
+    )
+
+
+def create_translated_wiktionary_files(
+    lemma_lang: str, gloss_langs: list[str], force_stages: Collection[str] = ()
+) -> list[Path]:
+    """
+    Create Wiktionary files of translated gloss languages that use the same Kaikki
+    file, the file is only read once for all languages that are not reused. The
+    file is created by the split step of the edition.
+    """
+    from .config import logger
+    from .extract_kaikki import create_lemmas_dbs_from_kaikki
+    from .trace import trace_span
+
+    steps = {
+        gloss_lang: wiktionary_step(lemma_lang, gloss_lang)
+        for gloss_lang in gloss_langs
+    }
+    paths = []
+    build_langs = []
+    for gloss_lang, step in steps.items():
+        outputs = None if "wiktionary" in force_stages else step.reusable_outputs()
+        if outputs is None:
+            build_langs.append(gloss_lang)
+        else:
+            logger.info(f"Reuse wiktionary step {step.name}")
+            paths.extend(outputs)
+    if len(build_langs) > 0:
+        with trace_span("wiktionary", f"{lemma_lang}_{'_'.join(build_langs)}"):
+            for gloss_lang, db_paths in create_lemmas_dbs_from_kaikki(
+                lemma_lang, build_langs
+            ).items():
+                steps[gloss_lang].save(db_paths)
+                paths.extend(db_paths)
+    return paths
+
+
+def create_klld_file(
+    gloss_lang: str, lemma_lang: str, force_stages: Collection[str] = ()
+) -> Path:
+    from .create_klld import create_klld_db
+    from .database import wiktionary_db_path
+
+    return run_step(
+        BuildStep(
+            "klld",
+            f"{lemma_lang}_{gloss_lang}",
+            [wiktionary_db_path(lemma_lang, gloss_lang)],
+            # the metadata version is the date of SOURCE_DATE_EPOCH
+            {"source_date_epoch": source_date_epoch()},
+        ),
+        lambda: [create_klld_db(gloss_lang, lemma_lang)],
+        force_stages,
+    )[0]
+
+
+def create_x_ray_file(
+    edition: str,
+    force_stages: Collection[str],
+    stream: bool,
+    in_memory: bool,
+    page_workers: int,
+) -> Path:
+    from .wiki_titles import create_wiki_db, title_sql_dump_versions
+
+    # "latest" dump files are identified by their HTTP headers, X-ray files are
+    # rebuilt when a new dump is published
+    return run_step(
+        BuildStep("x-ray", edition, params={"dumps": title_sql_dump_versions(edition)}),
+        lambda: [create_wiki_db(edition, stream, in_memory, page_workers)],
+        force_stages,
+    )[0]
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    import os
+    import sys
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Time from creating a pool to the first task's result, spawned workers of this
+    # script already import this module as "__mp_main__".
+    gloss_lang = sys.argv[1] if len(sys.argv) > 1 else "en"
+    for name, initializer, task in (
+        ("worker module", None, partial(os.getpid)),
+        ("worker module and main", None, partial(exec, "import proficiency.main")),
+        ("init_worker()", partial(init_worker, [gloss_lang], [gloss_lang]), os.getpid),
+    ):
+        elapsed_times = []
+        for _ in range(3):
+            start_time = time.perf_counter()
+            with ProcessPoolExecutor(
+                1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer,
+            ) as executor:
+                executor.submit(task).result()
+            elapsed_times.append(time.perf_counter() - start_time)
+        print(f"{name}: {min(elapsed_times):.3f}s")
@@ -0,0 +1,45 @@
+import bz2
+import io
+import os
+import tarfile
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from proficiency.archive import create_tar_bz2, normalize_tar_info
+
+
+class TestArchive(TestCase):
+    def test_create_tar_bz2(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = []
+            for name, size in (("a.db", 0), ("b.db", 511), ("c.db", 5000)):
+                path = Path(tmp_dir) / name
+                path.write_bytes(os.urandom(size))
+                paths.append(path)
+            tar_path = Path(tmp_dir) / "test.tar.bz2"
+            create_tar_bz2(tar_path, paths, 1700000000)
+            # same bytes as tarfile
+            tar_buf = io.BytesIO()
+            with tarfile.open(fileobj=tar_buf, mode="w") as tar_f:
+                for path in paths:
+                    tar_f.add(
+                        path,
+                        path.name,
+                        filter=lambda t: normalize_tar_info(t, 1700000000),
+                    )
+            self.assertEqual(bz2.decompress(tar_path.read_bytes()), tar_buf.getvalue())
+            # one bz2 stream
+            decompressor = bz2.BZ2Decompressor()
+            decompressor.decompress(tar_path.read_bytes())
+            self.assertTrue(decompressor.eof)
+            self.assertEqual(decompressor.unused_data, b"")
+            with (
+                tar_path.open("rb") as f,
+                tarfile.open(fileobj=f, mode="r|bz2") as tar_f,
+            ):
+                for path, tar_info in zip(paths, tar_f, strict=True):
+                    self.assertEqual(tar_info.name, path.name)
+                    member_f = tar_f.extractfile(tar_info)
+                    assert member_f is not None
+                    self.assertEqual(member_f.read(), path.read_bytes())
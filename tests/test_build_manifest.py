@@ -0,0 +1,88 @@
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase
+
+from proficiency.build_manifest import BuildStep, build_report, run_step
+from proficiency.extract_kaikki import split_kaikki_gz
+
+
+class TestBuildManifest(TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.old_cwd = Path.cwd()
+        os.chdir(self.tmp_dir.name)
+        self.input_path = Path("input.txt")
+        self.input_path.write_text("input")
+        self.output_path = Path("output.txt")
+        self.build_count = 0
+
+    def tearDown(self) -> None:
+        os.chdir(self.old_cwd)
+        self.tmp_dir.cleanup()
+
+    def build(self) -> list[Path]:
+        self.build_count += 1
+        self.output_path.write_text(self.input_path.read_text())
+        return [self.output_path]
+
+    def run_test_step(self, force_stages: tuple[str, ...] = ()) -> list[Path]:
+        return run_step(
+            BuildStep("split", "test", [self.input_path]), self.build, force_stages
+        )
+
+    def test_reuse_step(self) -> None:
+        start = time.time_ns()
+        self.assertEqual(self.run_test_step(), [self.output_path])
+        self.assertEqual(self.run_test_step(), [self.output_path])
+        self.assertEqual(self.build_count, 1)
+        self.assertEqual(
+            build_report(start), {"split": {"built": ["test"], "reused": []}}
+        )
+
+        start = time.time_ns()
+        self.run_test_step()
+        self.assertEqual(
+            build_report(start), {"split": {"built": [], "reused": ["test"]}}
+        )
+
+    def test_changed_files(self) -> None:
+        self.run_test_step()
+        # touched but not changed
+        os.utime(self.input_path, ns=(0, 0))
+        self.run_test_step()
+        self.assertEqual(self.build_count, 1)
+
+        self.input_path.write_text("new input")
+        self.run_test_step()
+        self.assertEqual(self.build_count, 2)
+
+        self.output_path.unlink()
+        self.run_test_step()
+        self.assertEqual(self.build_count, 3)
+
+    def test_force_stage(self) -> None:
+        self.run_test_step()
+        self.run_test_step(("split",))
+        self.assertEqual(self.build_count, 2)
+
+    def test_corrupt_split_input(self) -> None:
+        import gzip
+        import json
+
+        gz_path = Path("en.jsonl.gz")
+        lines = (
+            json.dumps({"word": str(index), "lang_code": "en"}) + "\n"
+            for index in range(10000)
+        )
+        gz_data = bytearray(gzip.compress("".join(lines).encode()))
+        # all lines are decompressed but the CRC is wrong
+        gz_data[-8] ^= 0xFF
+        gz_path.write_bytes(gz_data)
+        step = BuildStep("split", "en", [gz_path])
+        # gzip module raises BadGzipFile if gzip and pigz are not installed
+        with self.assertRaises((subprocess.CalledProcessError, OSError)):
+            run_step(step, lambda: split_kaikki_gz(gz_path, "en"))
+        self.assertIsNone(step.load_record())
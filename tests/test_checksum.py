@@ -0,0 +1,44 @@
+import hashlib
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from proficiency.checksum import hash_files, save_json, verify_checksum
+
+
+class TestChecksum(TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.tmp_dir.name)
+        self.paths = [self.folder / "a.bz2", self.folder / "empty.bz2"]
+        self.paths[0].write_bytes(b"a" * 10000)
+        self.paths[1].write_bytes(b"")
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_hash_files(self) -> None:
+        records = hash_files(self.paths, workers=2)
+        for path in self.paths:
+            self.assertEqual(
+                records[str(path)]["sha256"],
+                hashlib.sha256(path.read_bytes()).hexdigest(),
+            )
+        # unchanged files use cached digests
+        cached_records = {
+            path_str: record | {"sha256": "cached"}
+            for path_str, record in records.items()
+        }
+        self.assertEqual(hash_files(self.paths, cached_records), cached_records)
+
+    def test_verify(self) -> None:
+        checksum_path = self.folder / "sha256.json"
+        checksum = {
+            path.name: hashlib.sha256(path.read_bytes()).hexdigest()
+            for path in self.paths
+        }
+        save_json(checksum_path, checksum | {"missing.bz2": ""})
+        self.assertEqual(verify_checksum(self.folder, checksum_path), ["missing.bz2"])
+        self.paths[0].write_bytes(b"b")
+        save_json(checksum_path, checksum)
+        self.assertEqual(verify_checksum(self.folder, checksum_path), ["a.bz2"])
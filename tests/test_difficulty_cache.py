@@ -0,0 +1,36 @@
+import tempfile
+from importlib.util import find_spec
+from pathlib import Path
+from unittest import TestCase, skipUnless
+
+from proficiency.difficulty_cache import DifficultyCache
+
+
+@skipUnless(find_spec("wordfreq") is not None, "wordfreq is not installed")
+class TestDifficultyCache(TestCase):
+    def test_cache(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_path = Path(tmp_dir) / "difficulty.db"
+            cache = DifficultyCache("en", cache_path, "1", 1)
+            cache.prefetch()
+            value = cache.difficulty("the")
+            cache.close()
+
+            cache = DifficultyCache("en", cache_path, "1", 1)
+            cache.prefetch()
+            self.assertEqual(cache.values, {"the": value})
+            cache.close()
+
+            # values of other wordfreq versions, algorithm versions and languages
+            # are not used
+            for lemma_lang, version, algorithm_version in (
+                ("en", "2", 1),
+                ("en", "1", 0),
+                ("fr", "1", 1),
+            ):
+                cache = DifficultyCache(
+                    lemma_lang, cache_path, version, algorithm_version
+                )
+                cache.prefetch()
+                self.assertEqual(cache.values, {})
+                cache.close()
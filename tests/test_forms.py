@@ -0,0 +1,38 @@
+from unittest import TestCase
+
+from proficiency.extract_kaikki import EntryProcessor
+
+
+class TestForms(TestCase):
+    def test_czech_forms(self) -> None:
+        processor = EntryProcessor("cs", ["en"])
+        self.assertEqual(
+            processor.get_forms(
+                "malý",
+                "adj",
+                [
+                    {"form": "malými"},
+                    {"form": "malý"},
+                    {"form": "malá", "tags": ["table-tags"]},
+                ],
+            ),
+            {
+                "malými",
+                "nemalými",
+                "malýma",
+                "nemalýma",
+                "male",
+                "nemale",
+                "maleji",
+                "nejmaleji",
+                "nemaleji",
+                "nejnemaleji",
+            },
+        )
+        # form tags are only filtered for English glosses
+        self.assertEqual(
+            EntryProcessor("cs", ["fr"]).get_forms(
+                "nemalý", "noun", [{"form": "nemalá", "tags": ["table-tags"]}]
+            ),
+            {"nemalá"},
+        )
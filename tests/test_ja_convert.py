@@ -0,0 +1,74 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib.util import find_spec
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, skipUnless
+from urllib.parse import parse_qs, urlparse
+
+from proficiency.ja.convert import convert_jlpt
+
+PAGES = {
+    "Appendix:JLPT/N1": """<div><ul>
+    <li><a title="Appendix:JLPT/N1/あ行">あ行</a></li>
+    <li><a title="Appendix:JLPT/N1/か行">か行</a></li>
+    </ul></div>""",
+    "Appendix:JLPT/N1/あ行": """<div><ul>
+    <li><span class="Jpan">愛想</span></li>
+    <li><span class="Jpan">（アイロン）</span></li>
+    </ul></div>""",
+    "Appendix:JLPT/N1/か行": """<div><ul>
+    <li><span class="Jpan">二十（歳）</span><a title="Appendix:JLPT/N1">N1</a></li>
+    </ul></div>""",
+    "Appendix:JLPT/N5": """<div><ul>
+    <li><span class="Jpan">愛想</span><span class="tr">あたたか(い)</span></li>
+    </ul></div>""",
+}
+
+
+class WikiHandler(BaseHTTPRequestHandler):
+    requested_titles: list[str] = []
+
+    def do_GET(self) -> None:
+        title = parse_qs(urlparse(self.path).query)["page"][0]
+        self.requested_titles.append(title)
+        body = json.dumps({"parse": {"text": PAGES.get(title, "<div></div>")}}).encode(
+            "utf-8"
+        )
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@skipUnless(find_spec("requests") is not None, "requests is not installed")
+class TestJLPTConvert(TestCase):
+    def test_convert(self) -> None:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), WikiHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        api_url = f"http://127.0.0.1:{server.server_port}/w/api.php"
+        expected_words = {"愛想": 5, "アイロン": 1, "二十": 1, "あたたか": 5}
+        try:
+            with TemporaryDirectory() as cache_dir:
+                self.assertEqual(
+                    convert_jlpt(api_url, Path(cache_dir), workers=4), expected_words
+                )
+                # each page is requested once
+                self.assertEqual(
+                    sorted(WikiHandler.requested_titles),
+                    sorted(
+                        [*PAGES, *(f"Appendix:JLPT/N{level}" for level in (2, 3, 4))]
+                    ),
+                )
+                WikiHandler.requested_titles.clear()
+                # pages are loaded from the cache
+                self.assertEqual(convert_jlpt(api_url, Path(cache_dir)), expected_words)
+                self.assertEqual(WikiHandler.requested_titles, [])
+        finally:
+            server.shutdown()
+            server.server_close()
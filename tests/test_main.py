@@ -0,0 +1,44 @@
+import os
+import tarfile
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from proficiency.main import create_tar_file, get_lemma_langs
+
+
+class TestMain(TestCase):
+    def test_lemma_langs(self) -> None:
+        self.assertEqual(
+            get_lemma_langs(["en", "he"], ["en", "th"]),
+            {"en": ["en", "th"], "he": ["en"]},
+        )
+        # Thai isn't a lemma language of French
+        self.assertEqual(
+            get_lemma_langs(["en", "fr"], ["th"]), {"en": ["th"], "fr": []}
+        )
+        with self.assertRaises(ValueError):
+            get_lemma_langs(["he"], ["th"])
+
+    def test_reproducible_tar(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            old_cwd = Path.cwd()
+            os.chdir(tmp_dir)
+            try:
+                Path("build").mkdir()
+                path = Path("file.db")
+                path.write_bytes(b"data")
+                tar_bytes = []
+                with patch.dict(os.environ, {"SOURCE_DATE_EPOCH": "1700000000"}):
+                    for mtime in (1, 2):
+                        os.utime(path, (mtime, mtime))
+                        (tar_path,) = create_tar_file("test", [path])
+                        tar_bytes.append(tar_path.read_bytes())
+                self.assertEqual(tar_bytes[0], tar_bytes[1])
+                with tarfile.open(tar_path) as tar_f:
+                    tar_info = tar_f.getmember("file.db")
+                self.assertEqual(tar_info.mtime, 1700000000)
+                self.assertEqual(tar_info.uname, "")
+            finally:
+                os.chdir(old_cwd)
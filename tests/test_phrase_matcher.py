@@ -0,0 +1,51 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from proficiency.database import init_db
+from proficiency.extract_kaikki import LemmaEntry, LemmasDb, Sense, insert_entry
+from proficiency.phrase_matcher import PhraseMatcher, build_trie
+
+
+class TestPhraseMatcher(TestCase):
+    def test_longest_phrase(self) -> None:
+        matcher = PhraseMatcher(
+            build_trie(
+                [
+                    ("get", 1),
+                    ("get togged up", 2),
+                    ("got togged out", 2),
+                    ("Up", 3),
+                ],
+                False,
+            ),
+            False,
+        )
+        tokens = matcher.tokenize("They got togged out, then get togged up.")
+        self.assertEqual(
+            list(matcher.match(tokens)),
+            [(1, 4, [2]), (5, 8, [2])],
+        )
+
+    def test_match_by_character(self) -> None:
+        matcher = PhraseMatcher(build_trie([("自行车", 1), ("自行", 2)], True), True)
+        self.assertEqual(
+            list(matcher.match(matcher.tokenize("骑自行车"))), [(1, 4, [1])]
+        )
+
+    def test_lemma_without_forms(self) -> None:
+        with TemporaryDirectory() as temp_dir:
+            db_path = Path(temp_dir) / "ja.db"
+            db = LemmasDb("en", init_db(db_path))
+            for word, forms in (("愛想", set()), ("食べる", {"食べた"})):
+                insert_entry(
+                    [db],
+                    LemmaEntry(word, "noun", 1, forms, {}, [[Sense(gloss=word)]]),
+                )
+            db.conn.commit()
+            db.conn.close()
+            matcher = PhraseMatcher.from_db(db_path, "ja")
+            self.assertEqual(
+                list(matcher.match(matcher.tokenize("愛想と食べた"))),
+                [(0, 2, [1]), (3, 6, [2])],
+            )
@@ -0,0 +1,51 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from proficiency.compiled_difficulty import CompiledDifficulty
+from proficiency.sorted_table import (
+    FormTable,
+    SortedTable,
+    sense_id_ranges,
+    write_sorted_table,
+)
+
+
+class TestSortedTable(TestCase):
+    def test_lookup(self) -> None:
+        with TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "test.sst"
+            write_sorted_table(path, [("été", [3]), ("a", []), ("zoo", [1, 2])])
+            with SortedTable(path) as table:
+                self.assertEqual(list(table), ["a", "zoo", "été"])
+                self.assertEqual(list(table["zoo"]), [1, 2])
+                self.assertEqual(list(table["été"]), [3])
+                self.assertEqual(list(table["a"]), [])
+                self.assertNotIn("b", table)
+                self.assertIsNone(table.get("zz"))
+
+    def test_form_ranges(self) -> None:
+        self.assertEqual(sense_id_ranges({5, 1, 2, 3}), [1, 4, 5, 6])
+        with TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "test.sst"
+            write_sorted_table(path, [("got", sense_id_ranges({1, 2, 7}))])
+            with FormTable(path) as table:
+                self.assertEqual(table.lookup("GOT"), [range(1, 3), range(7, 8)])
+                self.assertEqual(table.lookup("get"), [])
+
+    def test_compiled_difficulty(self) -> None:
+        with TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "en.sst"
+            write_sorted_table(path, [("dog", [1, 10]), ("Dog", [3, 20])])
+            difficulty = CompiledDifficulty(path)
+            self.assertEqual(difficulty.difficulty("Dog"), 3)
+            self.assertIsNone(difficulty.difficulty("cat"))
+            self.assertEqual(difficulty.sense_ids(), {10, 20})
+
+    def test_empty_compiled_difficulty(self) -> None:
+        with TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "en.sst"
+            write_sorted_table(path, [])
+            difficulty = CompiledDifficulty(path)
+            self.assertEqual(len(difficulty), 0)
+            self.assertIsNone(difficulty.difficulty("dog"))
@@ -0,0 +1,52 @@
+from io import BytesIO
+from unittest import TestCase
+
+from proficiency.sql_dump import iter_line_blocks, iter_sql_rows
+
+SQL_DUMP = rb"""-- MySQL dump
+CREATE TABLE `page` (
+  `page_id` int(8) unsigned NOT NULL AUTO_INCREMENT,
+  PRIMARY KEY (`page_id`)
+);
+INSERT INTO `page` VALUES (1,0,'A_(b),(c)',0.5,NULL),(2,0,'It\'s_\\',-1,'x\ny');
+INSERT INTO `page` VALUES (3,4,'',1e3,'');
+"""
+
+
+class TestSQLDump(TestCase):
+    def test_all_columns(self) -> None:
+        for chunk_size in (1, 7, 1024):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(
+                    list(iter_sql_rows(BytesIO(SQL_DUMP), chunk_size=chunk_size)),
+                    [
+                        (1, 0, "A_(b),(c)", 0.5, None),
+                        (2, 0, "It's_\\", -1, "x\ny"),
+                        (3, 4, "", 1000.0, ""),
+                    ],
+                )
+
+    def test_selected_columns(self) -> None:
+        self.assertEqual(
+            list(iter_sql_rows(BytesIO(SQL_DUMP), (2, 0), chunk_size=5)),
+            [("A_(b),(c)", 1), ("It's_\\", 2), ("", 3)],
+        )
+
+    def test_column_values(self) -> None:
+        # NUL and NULL in a string column, no new line at the end
+        sql_dump = rb"INSERT INTO `t` VALUES (1,'a'),(2,'b\0c'),(3,NULL),(4,'d\\0');"
+        self.assertEqual(
+            list(iter_sql_rows(BytesIO(sql_dump))),
+            [(1, "a"), (2, "b\0c"), (3, None), (4, "d\\0")],
+        )
+
+    def test_truncated_dump(self) -> None:
+        with self.assertRaises(ValueError):
+            list(iter_sql_rows(BytesIO(SQL_DUMP[:-10])))
+
+    def test_line_blocks(self) -> None:
+        for block_size in (1, 50, 1024):
+            with self.subTest(block_size=block_size):
+                blocks = list(iter_line_blocks(BytesIO(SQL_DUMP), block_size))
+                self.assertEqual(b"".join(blocks), SQL_DUMP)
+                self.assertTrue(all(block.endswith(b"\n") for block in blocks))
@@ -0,0 +1,50 @@
+import json
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import TestCase
+
+from proficiency.trace import TRACE_DIR_ENV, finish_trace, start_trace, trace_span
+
+
+def traced_task() -> int:
+    with trace_span("test", "worker"):
+        return os.getpid()
+
+
+class TestTrace(TestCase):
+    def test_disabled(self) -> None:
+        os.environ.pop(TRACE_DIR_ENV, None)
+        with trace_span("test", "main") as args:
+            pass
+        self.assertEqual(args, {})
+
+    def test_trace(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            trace_path = Path(tmp_dir) / "trace.json"
+            trace_dir = start_trace()
+            with trace_span("test", "main") as args:
+                args["reused"] = False
+                with ProcessPoolExecutor(
+                    1, mp_context=multiprocessing.get_context("spawn")
+                ) as executor:
+                    worker_pid = executor.submit(traced_task).result()
+            finish_trace(trace_path)
+            self.assertFalse(trace_dir.exists())
+            self.assertNotIn(TRACE_DIR_ENV, os.environ)
+
+            with trace_path.open(encoding="utf-8") as f:
+                events = json.load(f)["traceEvents"]
+            spans = {event["name"]: event for event in events if event["ph"] == "X"}
+            self.assertEqual(spans.keys(), {"main", "worker"})
+            self.assertEqual(spans["main"]["pid"], os.getpid())
+            self.assertEqual(spans["worker"]["pid"], worker_pid)
+            self.assertFalse(spans["main"]["args"]["reused"])
+            self.assertIn("cpu_ms", spans["worker"]["args"])
+            if os.name == "posix":
+                self.assertGreater(spans["main"]["args"]["process_peak_rss_kib"], 0)
+            # the worker span is inside the main span
+            self.assertLessEqual(spans["main"]["ts"], spans["worker"]["ts"])
+            self.assertEqual(sum(event["ph"] == "M" for event in events), 2)
@@ -1,6 +1,12 @@
+import json
+import os
+import tempfile
+from io import BytesIO
+from pathlib import Path
 from unittest import TestCase
 
-from proficiency.extract_kaikki import Sense, get_translated_senses
+from proficiency.extract_kaikki import Sense, get_translated_senses, kaikki_json_path
+from proficiency.split_jsonl import split_kaikki_jsonl
 
 
 class TestTranslation(TestCase):
@@ -22,3 +28,38 @@ class TestTranslation(TestCase):
             ),
             [Sense(enabled=True, short_gloss="חיסרון", gloss="חיסרון")],
         )
+
+    def test_shared_json_path(self) -> None:
+        # translated gloss languages of English lemmas read the same file, which
+        # isn't the file of the English edition
+        self.assertEqual(
+            kaikki_json_path("en", "he"),
+            Path("build/en/en_en_translated.jsonl"),
+        )
+        self.assertNotEqual(kaikki_json_path("en", "he"), kaikki_json_path("en", "en"))
+
+    def test_split_translated_json(self) -> None:
+        # the English dump is split once for English and translated glosses
+        lines = [
+            {"word": "dog", "lang_code": "en", "translations": [{"code": "he"}]},
+            {"word": "cat", "lang_code": "en"},
+            {"word": "chien", "lang_code": "fr", "translations": [{"code": "he"}]},
+        ]
+        jsonl = "".join(json.dumps(line) + "\n" for line in lines).encode()
+        old_cwd = Path.cwd()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.chdir(tmp_dir)
+            try:
+                # not written if no translated gloss language is requested
+                split_kaikki_jsonl(BytesIO(jsonl), "en")
+                self.assertFalse(kaikki_json_path("en", "he").exists())
+                out_paths = split_kaikki_jsonl(BytesIO(jsonl), "en", ["en"])
+                self.assertIn(kaikki_json_path("en", "he"), out_paths)
+                with kaikki_json_path("en", "en").open(encoding="utf-8") as f:
+                    self.assertEqual(
+                        [json.loads(line)["word"] for line in f], ["dog", "cat"]
+                    )
+                with kaikki_json_path("en", "he").open(encoding="utf-8") as f:
+                    self.assertEqual([json.loads(line)["word"] for line in f], ["dog"])
+            finally:
+                os.chdir(old_cwd)
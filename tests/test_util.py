@@ -1,6 +1,7 @@
+from collections.abc import Iterator
 from unittest import TestCase
 
-from proficiency.util import get_short_def
+from proficiency.util import get_short_def, iter_in_thread
 
 
 class TestUtil(TestCase):
@@ -36,3 +37,22 @@ class TestUtil(TestCase):
             ),
             "large",
         )
+
+    def test_iter_in_thread(self) -> None:
+        self.assertEqual(
+            list(iter_in_thread(range(1000), chunk_size=7, max_chunks=2)),
+            list(range(1000)),
+        )
+        self.assertEqual(list(iter_in_thread([])), [])
+
+        def fail() -> Iterator[int]:
+            yield 1
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            list(iter_in_thread(fail()))
+
+        # stop before the thread reaches the end
+        items = iter_in_thread(range(10000), chunk_size=1, max_chunks=1)
+        self.assertEqual(next(items), 0)
+        items.close()
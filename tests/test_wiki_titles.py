@@ -0,0 +1,103 @@
+import sqlite3
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from unittest import TestCase
+
+from proficiency.wiki_titles import (
+    PAGE_COLUMNS,
+    parse_page_props_sql,
+    parse_page_sql,
+    parse_redirect_sql,
+    save_db,
+)
+
+PAGE_SQL = (
+    b"INSERT INTO `page` VALUES (1,0,'Foo',0),(2,1,'Talk',0),(3,0,'Bar_(a)',0);\n"
+    b"INSERT INTO `page` VALUES (4,0,'Baz',0),(5,0,'foo',0);\n"
+)
+PAGE_PROPS_SQL = (
+    b"INSERT INTO `page_props` VALUES (1,'wikibase_item','Q1',NULL),"
+    b"(1,'page_image_free','Foo.jpg',NULL),"
+    b"(1,'wikibase-shortdesc','A \\'foo\\'',NULL);\n"
+    b"INSERT INTO `page_props` VALUES (3,'wikibase_item','Q3',NULL),"
+    b"(4,'disambiguation','',NULL);\n"
+)
+
+# redirect from id 6 to a missing page, 7 to "FOO" (case insensitive), 8 to a
+# section of "Baz", 9 is an interwiki redirect and 10 is in another namespace
+REDIRECT_PAGE_SQL = (
+    b"INSERT INTO `page` VALUES (1,0,'Foo',0),(4,0,'Baz',0),(6,0,'Missing',1),"
+    b"(7,0,'Upper',1),(8,0,'Section',1),(9,0,'Interwiki',1),(10,0,'Other_ns',1);\n"
+)
+REDIRECT_SQL = (
+    b"INSERT INTO `redirect` VALUES (6,0,'No_page','',''),(7,0,'FOO','',''),"
+    b"(8,0,'Baz','','A_b'),(9,0,'Foo','en',''),(10,4,'Foo','','');\n"
+)
+
+
+def create_pages_table() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.execute(f"CREATE TABLE pages ({PAGE_COLUMNS})")
+    return conn
+
+
+class TestWikiTitles(TestCase):
+    def test_page_props(self) -> None:
+        conn = create_pages_table()
+        parse_page_sql(conn, BytesIO(PAGE_SQL))
+        parse_page_props_sql(conn, BytesIO(PAGE_PROPS_SQL))
+        self.assertEqual(
+            conn.execute(
+                """
+                SELECT title, description, wikidata_item, rowid FROM pages
+                ORDER BY rowid
+                """
+            ).fetchall(),
+            [("Foo", "A 'foo'", "Q1", 1), ("Bar (a)", None, "Q3", 3)],
+        )
+        conn.close()
+
+    def test_parallel_page_sql(self) -> None:
+        conn = create_pages_table()
+        parse_page_sql(conn, BytesIO(PAGE_SQL), workers=2)
+        self.assertEqual(
+            conn.execute("SELECT title, rowid FROM pages ORDER BY rowid").fetchall(),
+            [("Foo", 1), ("Bar (a)", 3), ("Baz", 4)],
+        )
+        conn.close()
+
+    def test_save_in_memory_db(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = Path(tmp_dir) / "pages.db"
+            conn = create_pages_table()
+            parse_page_sql(conn, BytesIO(PAGE_SQL))
+            save_db(conn, db_path, in_memory=True)
+            conn = sqlite3.connect(db_path)
+            self.assertEqual(
+                conn.execute("SELECT title FROM pages WHERE title = 'BAZ'").fetchall(),
+                [("Baz",)],
+            )
+            conn.close()
+
+    def test_redirects(self) -> None:
+        conn = create_pages_table()
+        parse_page_sql(conn, BytesIO(REDIRECT_PAGE_SQL))
+        parse_redirect_sql(conn, BytesIO(REDIRECT_SQL))
+        self.assertEqual(
+            conn.execute(
+                """
+                SELECT title, redirect_to, redirect_fragment FROM pages
+                ORDER BY rowid
+                """
+            ).fetchall(),
+            [
+                ("Foo", None, None),
+                ("Baz", None, None),
+                ("Upper", "FOO", None),
+                ("Section", "Baz", "A_b"),
+                ("Interwiki", None, None),
+                ("Other ns", None, None),
+            ],
+        )
+        conn.close()